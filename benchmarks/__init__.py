@@ -0,0 +1,58 @@
+"""Stand-alone performance benchmarks for Quiz Hunt.
+
+Each module can be run directly, e.g. ``python -m benchmarks.pin_hashing``,
+from the project root; it configures Django from ``quiz_hunt.settings``
+unless ``DJANGO_SETTINGS_MODULE`` says otherwise. Benchmarks that seed data
+run against a throwaway SQLite file and cache directory unless
+``--live-database`` is given.
+"""
+
+import os
+import tempfile
+
+
+def setup_django() -> None:
+    import django
+
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "quiz_hunt.settings")
+    django.setup()
+
+
+def add_database_argument(parser) -> None:
+    parser.add_argument(
+        "--live-database",
+        action="store_true",
+        help="Seed and measure the configured database and cache instead of a throwaway SQLite copy. "
+        "Seeded contestants show up on the live leaderboard while the run lasts.",
+    )
+
+
+def use_scratch_database() -> str:
+    """Point the default database and cache at a fresh, migrated temporary directory.
+
+    Must run before worker threads open connections; returns the directory.
+    """
+    from django.conf import settings
+    from django.core.management import call_command
+    from django.db import connections
+    from django.test.utils import override_settings
+
+    directory = tempfile.mkdtemp(prefix="quiz-bench-")
+    connections.close_all()
+    # Every thread's connection is built from this same dict, as in sqlite_submits.
+    connections["default"].settings_dict.update(
+        ENGINE="django.db.backends.sqlite3",
+        NAME=os.path.join(directory, "bench.sqlite3"),
+        OPTIONS={"timeout": 20},
+        HOST="",
+        PORT="",
+        USER="",
+        PASSWORD="",
+    )
+    del connections["default"]
+    cache = dict(settings.CACHES["default"])
+    if "LOCATION" in cache:
+        cache["LOCATION"] = os.path.join(directory, "cache")
+    override_settings(CACHES=dict(settings.CACHES, default=cache)).enable()
+    call_command("migrate", verbosity=0)
+    return directory
@@ -0,0 +1,169 @@
+"""Compare the sync and async contestant views under many concurrent contestants.
+
+Usage: python -m benchmarks.async_views [--contestants 200] [--questions 3] [--concurrency 200]
+
+Drives the ASGI request path in-process with ``django.test.AsyncClient``, one
+client per virtual contestant: QR entrypoint, nickname + PIN gate, then view
+and answer each question. Every request gets its own thread-sensitive context,
+as under ``quiz_hunt.asgi``, so sync views run on executor threads exactly as
+they would in production. The same flow runs once with ``CONTESTANT_VIEWS =
+"sync"`` and once with ``"async"`` against fresh contestants, and reports
+per-view latency, throughput and the peak number of live threads. Seeded data
+is removed afterwards; like the other seeding benchmarks it runs against a
+throwaway SQLite file unless ``--live-database`` is given.
+"""
+
+import argparse
+import asyncio
+import importlib
+import threading
+import time
+import uuid
+
+from benchmarks import add_database_argument, setup_django, use_scratch_database
+from benchmarks.flow import Recorder
+
+PIN = "123456"
+
+
+def _seed(run_id: str, contestants: int, questions: int):
+    from django.contrib.auth.hashers import make_password
+
+    from core.models import Choice, Contestant, ContestantScore, Question, pin_hasher_name
+
+    pin_hash = make_password(PIN, hasher=pin_hasher_name())
+    people = Contestant.objects.bulk_create(
+        Contestant(name=f"Async {i}", school_name=f"Bench {run_id}", nickname=f"async-{run_id}-{i}", pin_hash=pin_hash)
+        for i in range(contestants)
+    )
+    ContestantScore.rebuild(contestant_ids=[c.id for c in people])
+    items = []
+    for i in range(questions):
+        question = Question.objects.create(title=f"bench {run_id} question {i}")
+        choices = [Choice.objects.create(question=question, text=f"Choice {c}", is_correct=(c == 0)) for c in range(4)]
+        items.append((str(question.id), str(choices[0].id)))
+    return [c.nickname for c in people], items
+
+
+def _cleanup(run_id: str) -> None:
+    from core.models import Contestant, Question
+
+    Contestant.objects.filter(school_name=f"Bench {run_id}").delete()
+    Question.objects.filter(title__startswith=f"bench {run_id} ").delete()
+
+
+def _select_views(mode: str) -> None:
+    from django.conf import settings
+    from django.urls import clear_url_caches
+
+    settings.CONTESTANT_VIEWS = mode
+    import core.urls
+    import quiz_hunt.urls
+
+    importlib.reload(core.urls)
+    importlib.reload(quiz_hunt.urls)
+    clear_url_caches()
+
+
+async def _timed(client, recorder: Recorder, view: str, method: str, path: str, data=None, expect=(200, 302)):
+    from asgiref.sync import ThreadSensitiveContext
+
+    start = time.perf_counter()
+    async with ThreadSensitiveContext():
+        response = await getattr(client, method)(path, data or {})
+    recorder.add(view, time.perf_counter() - start, 0, response.status_code in expect)
+    return response
+
+
+async def _journey(nickname: str, items: list, recorder: Recorder, limit: asyncio.Semaphore) -> None:
+    from django.test import AsyncClient
+
+    client = AsyncClient()
+    async with limit:
+        first = items[0][0]
+        await _timed(client, recorder, "GET question_entrypoint", "get", f"/question/{first}/")
+        await _timed(
+            client,
+            recorder,
+            "POST question_entrypoint",
+            "post",
+            f"/question/{first}/",
+            {"nickname": nickname, "pin_code": PIN},
+            expect=(302,),
+        )
+        for question_id, choice_id in items:
+            await _timed(client, recorder, "GET question_detail", "get", f"/question/{question_id}/view/")
+            await _timed(
+                client, recorder, "POST submit_answer", "post", f"/question/{question_id}/submit/", {"choice_id": choice_id}
+            )
+
+
+async def _run_mode(nicknames: list, items: list, concurrency: int) -> dict:
+    recorder = Recorder()
+    peak_threads = threading.active_count()
+    done = asyncio.Event()
+
+    async def sample_threads():
+        nonlocal peak_threads
+        while not done.is_set():
+            peak_threads = max(peak_threads, threading.active_count())
+            await asyncio.sleep(0.01)
+
+    sampler = asyncio.create_task(sample_threads())
+    limit = asyncio.Semaphore(concurrency)
+    start = time.perf_counter()
+    await asyncio.gather(*(_journey(nickname, items, recorder, limit) for nickname in nicknames))
+    wall = time.perf_counter() - start
+    done.set()
+    await sampler
+    result = recorder.summary(wall)
+    result["peak_threads"] = peak_threads
+    return result
+
+
+def run(contestants: int = 200, questions: int = 3, concurrency: int = 200) -> dict:
+    from django.db import connections
+
+    run_id = uuid.uuid4().hex[:8]
+    nicknames, items = _seed(run_id, contestants * 2, questions)
+    connections.close_all()
+    results = {}
+    try:
+        for index, mode in enumerate(("sync", "async")):
+            _select_views(mode)
+            batch = nicknames[index * contestants : (index + 1) * contestants]
+            # asyncio.run rather than async_to_sync: the latter would pin every
+            # sync view to this one thread instead of per-request executor threads.
+            results[mode] = asyncio.run(_run_mode(batch, items, concurrency))
+    finally:
+        _select_views("sync")
+        _cleanup(run_id)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--contestants", type=int, default=200)
+    parser.add_argument("--questions", type=int, default=3)
+    parser.add_argument("--concurrency", type=int, default=200)
+    add_database_argument(parser)
+    args = parser.parse_args()
+    setup_django()
+    if not args.live_database:
+        use_scratch_database()
+    results = run(args.contestants, args.questions, args.concurrency)
+    for mode, result in results.items():
+        print(
+            f"{mode}: {result['requests']} requests in {result['wall_seconds']}s "
+            f"({result['throughput_rps']} req/s), peak threads {result['peak_threads']}"
+        )
+        print(f"  {'view':<28} {'n':>6} {'err':>4} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+        for view, stats in result["views"].items():
+            print(
+                f"  {view:<28} {stats['requests']:>6} {stats['errors']:>4} {stats['p50_ms']:>9.2f} "
+                f"{stats['p95_ms']:>9.2f} {stats['p99_ms']:>9.2f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,218 @@
+"""Drive the real contestant flow concurrently and report per-view latency and queries.
+
+Usage: python manage.py bench [--contestants 50] [--questions 10] [--concurrency 8] [--output run.json]
+   or: python -m benchmarks.flow ...
+
+Seeds M throwaway questions, then each of N virtual contestants registers,
+opens a question's QR entrypoint, logs in through the nickname + PIN gate and
+views and answers questions until the submission cap, using one
+``django.test.Client`` per worker thread. Everything goes through the full
+URL, middleware and template stack. Seeded data is removed afterwards unless
+``keep`` is set; unless ``--live-database`` is given, the run uses a throwaway
+SQLite file and cache directory, so nothing touches the event's data.
+"""
+
+import argparse
+import json
+import random
+import re
+import statistics
+import threading
+import time
+import uuid
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List
+
+from benchmarks import add_database_argument, setup_django, use_scratch_database
+
+_NICKNAME_RE = re.compile(r"Your nickname:</p>\s*<div[^>]*>([^<]+)</div>")
+_PIN_RE = re.compile(r"Your PIN \(shown only once\):</p>\s*<div[^>]*>(\d{6})</div>")
+
+
+def percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[index]
+
+
+class Recorder:
+    """Thread-safe collection of (view name, latency, query count) samples."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.samples: Dict[str, List[tuple]] = defaultdict(list)
+        self.errors: Dict[str, int] = defaultdict(int)
+
+    def add(self, view: str, seconds: float, queries: int, ok: bool) -> None:
+        with self._lock:
+            self.samples[view].append((seconds, queries))
+            if not ok:
+                self.errors[view] += 1
+
+    def summary(self, wall_seconds: float) -> dict:
+        views = {}
+        total = 0
+        for view, samples in sorted(self.samples.items()):
+            latencies = [s * 1000 for s, _ in samples]
+            queries = [q for _, q in samples]
+            total += len(samples)
+            views[view] = {
+                "requests": len(samples),
+                "errors": self.errors.get(view, 0),
+                "p50_ms": round(percentile(latencies, 50), 3),
+                "p95_ms": round(percentile(latencies, 95), 3),
+                "p99_ms": round(percentile(latencies, 99), 3),
+                "mean_queries": round(statistics.mean(queries), 2),
+                "max_queries": max(queries),
+            }
+        return {
+            "wall_seconds": round(wall_seconds, 3),
+            "requests": total,
+            "throughput_rps": round(total / wall_seconds, 2) if wall_seconds else 0.0,
+            "views": views,
+        }
+
+
+def _timed_request(client, recorder: Recorder, method: str, path: str, data=None, expect=(200, 302)):
+    from django.db import connection
+    from django.urls import resolve
+
+    queries = 0
+
+    def count(execute, sql, params, many, context):
+        nonlocal queries
+        queries += 1
+        return execute(sql, params, many, context)
+
+    start = time.perf_counter()
+    with connection.execute_wrapper(count):
+        response = getattr(client, method)(path, data or {})
+    elapsed = time.perf_counter() - start
+    recorder.add(f"{method.upper()} {resolve(path).url_name}", elapsed, queries, response.status_code in expect)
+    return response
+
+
+def _contestant_journey(index: int, run_id: str, questions: list, recorder: Recorder, cap: int) -> None:
+    from django.db import connections
+    from django.test import Client
+
+    client = Client()
+    rng = random.Random(index)
+    try:
+        response = _timed_request(
+            client, recorder, "post", "/register/", {"name": f"Bench {index}", "school_name": f"Bench {run_id}"}
+        )
+        html = response.content.decode()
+        nickname, pin = _NICKNAME_RE.search(html), _PIN_RE.search(html)
+        if not (nickname and pin):
+            recorder.add("POST register", 0.0, 0, False)
+            return
+
+        order = rng.sample(questions, len(questions))
+        first_id = order[0][0]
+        _timed_request(client, recorder, "get", f"/question/{first_id}/")
+        _timed_request(
+            client,
+            recorder,
+            "post",
+            f"/question/{first_id}/",
+            {"nickname": nickname.group(1).strip(), "pin_code": pin.group(1)},
+            expect=(302,),
+        )
+        for question_id, choice_ids in order[:cap]:
+            _timed_request(client, recorder, "get", f"/question/{question_id}/view/")
+            _timed_request(
+                client, recorder, "post", f"/question/{question_id}/submit/", {"choice_id": rng.choice(choice_ids)}
+            )
+    finally:
+        connections.close_all()
+
+
+def _seed_questions(run_id: str, count: int) -> list:
+    from core.models import Choice, Question
+
+    seeded = []
+    for i in range(count):
+        question = Question.objects.create(title=f"bench {run_id} question {i}", body="Benchmark question")
+        choices = [Choice.objects.create(question=question, text=f"Choice {c}", is_correct=(c == 0)) for c in range(4)]
+        seeded.append((str(question.id), [str(c.id) for c in choices]))
+    return seeded
+
+
+def _cleanup(run_id: str) -> None:
+    from core.models import Contestant, Question
+
+    Contestant.objects.filter(school_name=f"Bench {run_id}").delete()
+    Question.objects.filter(title__startswith=f"bench {run_id} ").delete()
+
+
+def run_flow(contestants: int = 50, questions: int = 10, concurrency: int = 8, keep: bool = False) -> dict:
+    from core.models import QuizConfig
+
+    run_id = uuid.uuid4().hex[:8]
+    cap = min(questions, QuizConfig.get_solo().total_allowed_answers_per_user)
+    seeded = _seed_questions(run_id, questions)
+    recorder = Recorder()
+    try:
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            for future in [
+                pool.submit(_contestant_journey, i, run_id, seeded, recorder, cap) for i in range(contestants)
+            ]:
+                future.result()
+        wall = time.perf_counter() - start
+    finally:
+        if not keep:
+            _cleanup(run_id)
+    result = recorder.summary(wall)
+    result["parameters"] = {
+        "run_id": run_id,
+        "contestants": contestants,
+        "questions": questions,
+        "concurrency": concurrency,
+        "answers_per_contestant": cap,
+    }
+    return result
+
+
+def format_summary(result: dict) -> str:
+    lines = [
+        f"{result['requests']} requests in {result['wall_seconds']}s ({result['throughput_rps']} req/s)",
+        f"{'view':<32} {'n':>6} {'err':>4} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'queries':>8}",
+    ]
+    for view, stats in result["views"].items():
+        lines.append(
+            f"{view:<32} {stats['requests']:>6} {stats['errors']:>4} {stats['p50_ms']:>9.2f} "
+            f"{stats['p95_ms']:>9.2f} {stats['p99_ms']:>9.2f} {stats['mean_queries']:>8.2f}"
+        )
+    return "\n".join(lines)
+
+
+def add_arguments(parser) -> None:
+    parser.add_argument("--contestants", type=int, default=50)
+    parser.add_argument("--questions", type=int, default=10)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--output", help="Write the full result as JSON to this path.")
+    parser.add_argument("--keep", action="store_true", help="Keep the seeded contestants and questions.")
+    add_database_argument(parser)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    add_arguments(parser)
+    args = parser.parse_args()
+    setup_django()
+    if not args.live_database:
+        use_scratch_database()
+    result = run_flow(args.contestants, args.questions, args.concurrency, args.keep)
+    print(format_summary(result))
+    if args.output:
+        with open(args.output, "w") as handle:
+            json.dump(result, handle, indent=2)
+
+
+if __name__ == "__main__":
+    main()
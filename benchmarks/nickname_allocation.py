@@ -0,0 +1,52 @@
+"""Register many contestants with the same name and school through RegistrationForm.
+
+Usage: python -m benchmarks.nickname_allocation [--count 1000]
+
+Reports queries and time per registration as the collision chain grows. PIN
+hashing is excluded by using the MD5 hasher for the run, and everything runs
+inside a transaction that is rolled back, so the database is left untouched.
+"""
+
+import argparse
+import time
+
+from benchmarks import setup_django
+
+
+def run(count: int, report_every: int):
+    from django.db import connection, transaction
+    from django.test.utils import CaptureQueriesContext, override_settings
+
+    from core.forms import RegistrationForm
+
+    rows = []
+    with override_settings(
+        PASSWORD_HASHERS=["django.contrib.auth.hashers.MD5PasswordHasher"],
+        PIN_PASSWORD_HASHER="md5",
+    ), transaction.atomic():
+        for i in range(1, count + 1):
+            start = time.perf_counter()
+            with CaptureQueriesContext(connection) as ctx:
+                form = RegistrationForm({"name": "Asha Verma", "school_name": "City Public School"})
+                form.is_valid()
+                contestant, _ = form.save()
+            elapsed = time.perf_counter() - start
+            if i == 1 or i % report_every == 0:
+                rows.append((i, contestant.nickname, len(ctx.captured_queries), elapsed * 1000))
+        transaction.set_rollback(True)
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--count", type=int, default=1000)
+    parser.add_argument("--report-every", type=int, default=100)
+    args = parser.parse_args()
+    setup_django()
+    print(f"{'#':>6}  {'nickname':<40} {'queries':>7} {'ms':>8}")
+    for i, nickname, queries, ms in run(args.count, args.report_every):
+        print(f"{i:>6}  {nickname:<40} {queries:>7} {ms:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
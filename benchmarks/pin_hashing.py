@@ -0,0 +1,54 @@
+"""Compare PIN logins per second under the default and the dedicated PIN hasher.
+
+Usage: python -m benchmarks.pin_hashing [--seconds 3] [--workers 4]
+
+Only hashing is measured (no database), which is the part of
+``Contestant.check_pin`` that dominates login latency at event start.
+"""
+
+import argparse
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from benchmarks import setup_django
+
+
+def _check_many(args):
+    hasher_name, encoded, seconds = args
+    setup_django()
+    from django.contrib.auth.hashers import check_password
+
+    done = 0
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        check_password("123456", encoded, preferred=hasher_name)
+        done += 1
+    return done
+
+
+def run(seconds: float, workers: int):
+    from django.conf import settings
+    from django.contrib.auth.hashers import make_password
+
+    results = {}
+    for label, hasher_name in (("default", "default"), ("pin", settings.PIN_PASSWORD_HASHER)):
+        encoded = make_password("123456", hasher=hasher_name)
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            total = sum(pool.map(_check_many, [(hasher_name, encoded, seconds)] * workers))
+        results[label] = {"hasher": encoded.split("$", 2)[:2], "logins_per_second": total / seconds}
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--seconds", type=float, default=3.0)
+    parser.add_argument("--workers", type=int, default=4)
+    args = parser.parse_args()
+    setup_django()
+    for label, result in run(args.seconds, args.workers).items():
+        algorithm, iterations = result["hasher"]
+        print(f"{label:>8}: {algorithm} x{iterations}  {result['logins_per_second']:.1f} logins/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""Database queries per contestant question view under each session backend.
+
+Usage: python -m benchmarks.session_queries [--views 20]
+
+Logs a throwaway contestant in and repeatedly opens a question, counting all
+queries and those against ``django_session`` per view, for the db, cached_db
+and signed_cookies engines. Seeded rows are deleted afterwards.
+"""
+
+import argparse
+import uuid
+
+from benchmarks import add_database_argument, setup_django, use_scratch_database
+
+ENGINES = (
+    "django.contrib.sessions.backends.db",
+    "django.contrib.sessions.backends.cached_db",
+    "django.contrib.sessions.backends.signed_cookies",
+)
+
+
+def _measure(engine: str, question_id, nickname: str, pin: str, views: int):
+    from django.db import connection
+    from django.test import Client
+    from django.test.utils import override_settings
+
+    total = session = 0
+
+    def count(execute, sql, params, many, context):
+        nonlocal total, session
+        total += 1
+        if "django_session" in sql:
+            session += 1
+        return execute(sql, params, many, context)
+
+    with override_settings(SESSION_ENGINE=engine):
+        client = Client()
+        client.post(f"/question/{question_id}/", {"nickname": nickname, "pin_code": pin})
+        with connection.execute_wrapper(count):
+            for _ in range(views):
+                client.get(f"/question/{question_id}/view/")
+    return total / views, session / views
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--views", type=int, default=20)
+    add_database_argument(parser)
+    args = parser.parse_args()
+    setup_django()
+    if not args.live_database:
+        use_scratch_database()
+
+    from core.models import Choice, Contestant, Question
+
+    tag = uuid.uuid4().hex[:8]
+    question = Question.objects.create(title=f"session bench {tag}")
+    Choice.objects.create(question=question, text="A", is_correct=True)
+    contestant = Contestant(name="Session", school_name="Bench", nickname=f"session-bench-{tag}")
+    contestant.set_pin("123456")
+    contestant.save()
+    try:
+        print(f"{'engine':<50} {'queries/view':>12} {'session queries/view':>21}")
+        for engine in ENGINES:
+            total, session = _measure(engine, question.id, contestant.nickname, "123456", args.views)
+            print(f"{engine:<50} {total:>12.2f} {session:>21.2f}")
+    finally:
+        contestant.delete()
+        question.delete()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""Answer submissions per second on SQLite, stock configuration vs the tuned profile.
+
+Usage: python -m benchmarks.sqlite_submits [--clients 16] [--submits 50]
+
+Each phase runs against a fresh temporary database: N client threads each
+submit answers through ``core.services.submit_answer`` for their own
+contestant, while one extra thread keeps reading the leaderboard as the
+dashboard would. Reports throughput and "database is locked" failures.
+"""
+
+import argparse
+import os
+import tempfile
+import threading
+import time
+
+from benchmarks import setup_django
+
+STOCK = {"pragmas": {}, "timeout": 5, "serialize": False}
+TUNED = {"pragmas": None, "timeout": 20, "serialize": False}
+TUNED_SERIAL = {"pragmas": None, "timeout": 20, "serialize": True}
+
+
+def _phase(profile, clients: int, submits: int):
+    from django.conf import settings
+    from django.core.management import call_command
+    from django.db import OperationalError, connections
+    from django.test.utils import override_settings
+
+    from core import services
+    from core.bundles import get_question_bundle
+    from core.models import LEADERBOARD_ORDERING, Choice, Contestant, ContestantScore, Question
+
+    connections.close_all()
+    path = os.path.join(tempfile.mkdtemp(prefix="quiz-bench-"), "bench.sqlite3")
+    database = dict(settings.DATABASES["default"], NAME=path, OPTIONS={"timeout": profile["timeout"]}, CONN_MAX_AGE=0)
+    pragmas = settings.SQLITE_PRAGMAS if profile["pragmas"] is None else profile["pragmas"]
+
+    with override_settings(SQLITE_PRAGMAS=pragmas, SQLITE_SERIALIZE_WRITES=profile["serialize"]):
+        connections["default"].settings_dict.update(database)
+        call_command("migrate", verbosity=0)
+        people = [Contestant.objects.create(name=f"C{i}", school_name="Bench", nickname=f"bench-{i}") for i in range(clients)]
+        bundles = []
+        for i in range(submits):
+            question = Question.objects.create(title=f"Q{i}")
+            Choice.objects.create(question=question, text="right", is_correct=True)
+            bundles.append(get_question_bundle(question.id))
+        connections.close_all()
+
+        failures = []
+        done = threading.Event()
+
+        def client(contestant):
+            try:
+                for bundle in bundles:
+                    try:
+                        services.submit_answer(contestant, bundle, bundle.choices[0], limit=submits)
+                    except OperationalError as exc:
+                        failures.append(str(exc))
+            finally:
+                connections.close_all()
+
+        def reader():
+            try:
+                while not done.is_set():
+                    list(ContestantScore.objects.order_by(*LEADERBOARD_ORDERING)[:50])
+            finally:
+                connections.close_all()
+
+        threads = [threading.Thread(target=client, args=(c,)) for c in people]
+        watcher = threading.Thread(target=reader)
+        start = time.perf_counter()
+        watcher.start()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - start
+        done.set()
+        watcher.join()
+    connections.close_all()
+    attempted = clients * submits
+    return {"submits_per_second": (attempted - len(failures)) / elapsed, "failed": len(failures), "attempted": attempted}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--clients", type=int, default=16)
+    parser.add_argument("--submits", type=int, default=50, help="Answers per client.")
+    args = parser.parse_args()
+    setup_django()
+    for label, profile in (("stock", STOCK), ("tuned", TUNED), ("tuned+queue", TUNED_SERIAL)):
+        result = _phase(profile, args.clients, args.submits)
+        print(
+            f"{label:>12}: {result['submits_per_second']:8.1f} submits/s  "
+            f"failed {result['failed']}/{result['attempted']}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""Load-test the leaderboard SSE broadcaster with many simulated subscribers.
+
+Usage: python -m benchmarks.sse_fanout [--subscribers 500] [--answers 50]
+
+Seeds throwaway contestants and questions (nicknames prefixed ``ssebench-``,
+deleted afterwards, in a throwaway SQLite file unless ``--live-database`` is
+given), subscribes N asyncio consumers to the in-process
+broadcaster, then records answers through the real submission service and
+reports delivery latency plus the broadcaster's database queries per answer.
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+
+from benchmarks import add_database_argument, setup_django, use_scratch_database
+
+
+def _seed(contestants: int, questions: int):
+    from core.models import Choice, Contestant, Question
+
+    people = [Contestant.objects.create(name=f"SSE {i}", school_name="Bench", nickname=f"ssebench-{i}") for i in range(contestants)]
+    items = []
+    for i in range(questions):
+        question = Question.objects.create(title=f"ssebench question {i}")
+        items.append((question, Choice.objects.create(question=question, text="right", is_correct=True)))
+    return people, items
+
+
+def _cleanup():
+    from core.models import Contestant, Question
+
+    Contestant.objects.filter(nickname__startswith="ssebench-").delete()
+    Question.objects.filter(title__startswith="ssebench question").delete()
+
+
+def _submit(contestant, question, choice):
+    from core import services
+    from core.bundles import get_question_bundle
+
+    bundle = get_question_bundle(question.id)
+    services.submit_answer(contestant, bundle, bundle.get_choice(choice.id), limit=10_000)
+    return time.perf_counter()
+
+
+async def run(subscribers: int, answers: int, contestants: int):
+    from asgiref.sync import sync_to_async
+    from django.db import connection
+
+    from core.broadcast import LeaderboardBroadcaster
+
+    class CountingBroadcaster(LeaderboardBroadcaster):
+        queries = 0
+
+        def _compute_events(self):
+            def count(execute, sql, params, many, context):
+                self.queries += 1
+                return execute(sql, params, many, context)
+
+            with connection.execute_wrapper(count):
+                return super()._compute_events()
+
+    broadcaster = CountingBroadcaster(poll_seconds=30)
+    people, items = await sync_to_async(_seed)(contestants, max(1, answers // contestants + 1))
+    try:
+        queues = [await broadcaster.subscribe() for _ in range(subscribers)]
+        for queue in queues:
+            queue.get_nowait()  # initial snapshot
+
+        latencies = []
+        queries_before = broadcaster.queries
+        for n in range(answers):
+            contestant = people[n % len(people)]
+            question, choice = items[n // len(people)]
+            sent = await sync_to_async(_submit)(contestant, question, choice)
+            broadcaster.notify()
+            for queue in queues:
+                await queue.get()
+                while not queue.empty():
+                    queue.get_nowait()
+            latencies.append(time.perf_counter() - sent)
+        queries = broadcaster.queries - queries_before
+        for queue in queues:
+            broadcaster.unsubscribe(queue)
+        return latencies, queries
+    finally:
+        await sync_to_async(_cleanup)()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--subscribers", type=int, default=500)
+    parser.add_argument("--answers", type=int, default=50)
+    parser.add_argument("--contestants", type=int, default=25)
+    add_database_argument(parser)
+    args = parser.parse_args()
+    setup_django()
+    if not args.live_database:
+        use_scratch_database()
+    latencies, queries = asyncio.run(run(args.subscribers, args.answers, args.contestants))
+    latencies.sort()
+    ms = [x * 1000 for x in latencies]
+    print(f"subscribers: {args.subscribers}  answers: {args.answers}")
+    print(f"delivery to all subscribers: p50 {statistics.median(ms):.2f} ms  p95 {ms[int(len(ms) * 0.95) - 1]:.2f} ms")
+    print(f"broadcaster queries: {queries}  ({queries / args.answers:.1f} per answer, for all subscribers)")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,67 +1,27 @@
-import io
 import base64
-import socket
 
-import qrcode
 from django.contrib import admin
+from django.db import transaction
+from django.http import HttpResponse
 from django.urls import reverse
 from django.utils.html import format_html
+from django.utils.timezone import now
 
-from .models import QuizConfig, Contestant, Question, Choice, QuestionImage, Answer
-
-
-def get_local_ip_address():
-    """
-    Get the local IP address of the machine running the server.
-    Returns the first non-loopback IPv4 address found.
-    """
-    try:
-        # Method 1: Connect to external address to determine active interface
-        # This is the most reliable method - determines which interface would route to internet
-        s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-        try:
-            # Doesn't actually connect, just determines which interface would be used
-            s.connect(('8.8.8.8', 80))
-            ip = s.getsockname()[0]
-            s.close()
-            if ip and ip != '127.0.0.1':
-                return ip
-        except (socket.error, OSError):
-            pass
-        finally:
-            s.close()
-    except (socket.error, OSError):
-        pass
-    
-    # Method 2: Try to get IP from hostname
-    try:
-        hostname = socket.gethostname()
-        local_ip = socket.gethostbyname(hostname)
-        # Check if it's not loopback
-        if local_ip and local_ip != '127.0.0.1':
-            return local_ip
-    except (socket.error, OSError):
-        pass
-    
-    # Method 3: Check all network interfaces
-    try:
-        # Get all IP addresses associated with hostname
-        addrs = socket.getaddrinfo(socket.gethostname(), None, socket.AF_INET)
-        for addr in addrs:
-            ip = addr[4][0]
-            # Skip loopback and link-local addresses
-            if ip and ip != '127.0.0.1' and not ip.startswith('169.254'):
-                return ip
-    except (socket.error, OSError, AttributeError):
-        pass
-    
-    # Fallback to localhost
-    return '127.0.0.1'
+from .models import QuizConfig, Contestant, Question, Choice, QuestionImage, Answer, PinLoginFailure, Task
+from .taskqueue import wake
+from .qr import get_base_url, get_question_qr_png, question_url, render_question_sheets
 
 
 @admin.register(QuizConfig)
 class QuizConfigAdmin(admin.ModelAdmin):
     list_display = ("total_allowed_answers_per_user", "quiz_started_at")
+    actions = ["reload_cached_config"]
+
+    @admin.action(description="Reload cached quiz settings")
+    def reload_cached_config(self, request, queryset):
+        """Force every worker to re-read the config, e.g. after editing the database directly."""
+        QuizConfig.invalidate_solo()
+        self.message_user(request, "Quiz settings cache reloaded.")
 
 
 @admin.register(Contestant)
@@ -86,6 +46,7 @@ class QuestionAdmin(admin.ModelAdmin):
     list_filter = ("is_active",)
     inlines = [ChoiceInline, QuestionImageInline]
     readonly_fields = ("created_at", "qr_code_display")
+    actions = ["download_qr_zip", "download_qr_pdf"]
 
     fieldsets = (
         (None, {"fields": ("title", "body", "is_active", "created_at")}),
@@ -94,39 +55,7 @@ class QuestionAdmin(admin.ModelAdmin):
 
     def _get_base_url(self, request=None):
         """Get the base URL for QR code generation using local IP address."""
-        from django.conf import settings
-        
-        # First check if explicitly set in settings
-        if hasattr(settings, "QR_CODE_BASE_URL"):
-            return settings.QR_CODE_BASE_URL
-        
-        # Get local IP address
-        local_ip = get_local_ip_address()
-        
-        # Get port from request or use default
-        port = 8000  # Default Django development port
-        scheme = "http"
-        
-        if request:
-            scheme = "https" if request.is_secure() else "http"
-            host = request.get_host()
-            
-            # Extract port from host if present (e.g., "192.168.1.100:8000" or "localhost:8000")
-            if ':' in host:
-                try:
-                    port = int(host.split(':')[1])
-                except (ValueError, IndexError):
-                    pass
-            else:
-                # Try to get port from server port in request meta
-                server_port = request.META.get('SERVER_PORT')
-                if server_port:
-                    try:
-                        port = int(server_port)
-                    except (ValueError, TypeError):
-                        pass
-        
-        return f"{scheme}://{local_ip}:{port}"
+        return get_base_url(request)
 
     def qr_code_link(self, obj):
         """Display link to view QR code in admin change form."""
@@ -142,33 +71,13 @@ class QuestionAdmin(admin.ModelAdmin):
         if not obj.pk:
             return "Save the question first to generate QR code."
         
-        # Build the question URL
-        from django.urls import reverse
-        path = reverse("question_entrypoint", args=[obj.id])
-        
         # Get request from admin context if available
         request = getattr(self, "_request", None)
         base_url = self._get_base_url(request)
-        full_url = f"{base_url}{path}"
-        
-        # Generate QR code
-        qr = qrcode.QRCode(
-            version=1,
-            error_correction=qrcode.constants.ERROR_CORRECT_L,
-            box_size=10,
-            border=4,
-        )
-        qr.add_data(full_url)
-        qr.make(fit=True)
-        
-        # Create image
-        img = qr.make_image(fill_color="black", back_color="white")
-        
-        # Convert to base64
-        buffer = io.BytesIO()
-        img.save(buffer, format="PNG")
-        img_str = base64.b64encode(buffer.getvalue()).decode()
-        
+        full_url = question_url(obj.id, base_url)
+
+        img_str = base64.b64encode(get_question_qr_png(obj.id, base_url)).decode()
+
         # Return HTML with image and URL
         return format_html(
             '<div id="qr_code_display" style="margin: 20px 0;">'
@@ -182,6 +91,20 @@ class QuestionAdmin(admin.ModelAdmin):
         )
     qr_code_display.short_description = "QR Code"
 
+    def _qr_sheets_response(self, request, queryset, fmt, content_type):
+        data = render_question_sheets(queryset.order_by("created_at"), self._get_base_url(request), fmt=fmt)
+        response = HttpResponse(data, content_type=content_type)
+        response["Content-Disposition"] = f'attachment; filename="question-qr-codes.{fmt}"'
+        return response
+
+    @admin.action(description="Download QR codes (ZIP of PNGs)")
+    def download_qr_zip(self, request, queryset):
+        return self._qr_sheets_response(request, queryset, "zip", "application/zip")
+
+    @admin.action(description="Download QR codes (printable PDF)")
+    def download_qr_pdf(self, request, queryset):
+        return self._qr_sheets_response(request, queryset, "pdf", "application/pdf")
+
     def changeform_view(self, request, *args, **kwargs):
         """Store request for use in readonly fields."""
         self._request = request
@@ -193,3 +116,43 @@ class AnswerAdmin(admin.ModelAdmin):
     list_display = ("contestant", "question", "is_correct", "submitted_at")
     list_filter = ("is_correct", "submitted_at")
     search_fields = ("contestant__nickname", "question__title")
+
+
+@admin.register(PinLoginFailure)
+class PinLoginFailureAdmin(admin.ModelAdmin):
+    """Failed PIN logins per nickname or IP; delete a row to lift its throttle early."""
+
+    list_display = ("scope", "ident", "count", "window_start")
+    list_filter = ("scope",)
+    search_fields = ("ident",)
+    readonly_fields = ("scope", "ident", "count", "window_start")
+
+    def has_add_permission(self, request):
+        return False
+
+
+@admin.register(Task)
+class TaskAdmin(admin.ModelAdmin):
+    list_display = ("name", "status", "attempts", "max_attempts", "run_at", "created_at")
+    list_filter = ("status", "name")
+    readonly_fields = (
+        "name",
+        "kwargs",
+        "status",
+        "attempts",
+        "max_attempts",
+        "run_at",
+        "locked_until",
+        "last_error",
+        "created_at",
+    )
+    actions = ["retry_now"]
+
+    def has_add_permission(self, request):
+        return False
+
+    @admin.action(description="Retry selected tasks now")
+    def retry_now(self, request, queryset):
+        count = queryset.update(status=Task.PENDING, attempts=0, run_at=now(), locked_until=None)
+        transaction.on_commit(wake)
+        self.message_user(request, f"{count} task(s) queued for another run.")
@@ -0,0 +1,112 @@
+"""Async versions of the contestant hot path, selected with ``CONTESTANT_VIEWS = "async"``.
+
+They behave exactly like their counterparts in ``core.views`` but never hold a
+thread while waiting: lookups use the async ORM and cache APIs, PIN hashing
+runs on the bounded executor from ``core.hashers``, and only the submission
+transaction (Django has no async transactions) is handed to a thread. Serve
+them through ``quiz_hunt.asgi``; under WSGI every request would pay for an
+event loop instead.
+"""
+
+from uuid import UUID
+
+from asgiref.sync import sync_to_async
+from django.core.exceptions import ValidationError
+from django.http import HttpRequest, HttpResponse
+from django.shortcuts import redirect, render
+
+from . import services
+from .bundles import aget_active_bundle_or_404
+from .forms import AnswerForm, NicknameGateForm, aauthenticate_contestant
+from .middleware import SESSION_AUTH_USER_ID, aget_contestant, aget_progress, clear_progress, record_progress
+from .models import QuizConfig
+from .views import _conditional_response, _question_detail_response, _question_page_etag, _render_question_detail
+
+
+async def question_entrypoint(request: HttpRequest, question_id: UUID) -> HttpResponse:
+    cfg = await QuizConfig.aget_solo()
+    question = await aget_active_bundle_or_404(question_id)
+
+    contestant = await aget_contestant(request)
+    if contestant:
+        return redirect("question_detail", question_id=question.id)
+
+    if request.method == "POST":
+        form = NicknameGateForm(request.POST, remote_addr=request.META.get("REMOTE_ADDR"), authenticate=False)
+        if form.is_valid():
+            try:
+                contestant_obj = await aauthenticate_contestant(
+                    form.cleaned_data["nickname"], form.cleaned_data["pin_code"], form.remote_addr
+                )
+            except ValidationError as error:
+                form.add_error(None, error)
+            else:
+                request.session[SESSION_AUTH_USER_ID] = str(contestant_obj.id)
+                clear_progress(request)
+                await aget_progress(request, contestant_obj)
+                return redirect("question_detail", question_id=question.id)
+    else:
+        return _conditional_response(
+            request,
+            _question_page_etag(request, question, "gate"),
+            lambda: render(request, "nickname_gate.html", {"cfg": cfg, "form": NicknameGateForm(), "question": question}),
+        )
+
+    return render(
+        request,
+        "nickname_gate.html",
+        {"cfg": cfg, "form": form, "question": question},
+    )
+
+
+async def question_detail(request: HttpRequest, question_id: UUID) -> HttpResponse:
+    cfg = await QuizConfig.aget_solo()
+    question = await aget_active_bundle_or_404(question_id)
+    contestant = await aget_contestant(request)
+    if not contestant:
+        return redirect("question_entrypoint", question_id=question.id)
+
+    progress = await aget_progress(request, contestant)
+    return _question_detail_response(request, cfg, question, contestant, progress)
+
+
+async def submit_answer(request: HttpRequest, question_id: UUID) -> HttpResponse:
+    cfg = await QuizConfig.aget_solo()
+    question = await aget_active_bundle_or_404(question_id)
+    contestant = await aget_contestant(request)
+    if not contestant:
+        return redirect("question_entrypoint", question_id=question.id)
+
+    if request.method != "POST":
+        return redirect("question_detail", question_id=question.id)
+
+    progress = await aget_progress(request, contestant)
+    total_answers = progress.answer_count
+    if total_answers >= cfg.total_allowed_answers_per_user or progress.has_answered(question.id):
+        return redirect("question_detail", question_id=question.id)
+
+    form = AnswerForm(question, request.POST)
+    if not form.is_valid():
+        return _render_question_detail(request, cfg, question, contestant, form, total_answers)
+
+    result = await sync_to_async(services.submit_answer)(
+        contestant, question, form.get_choice(), cfg.total_allowed_answers_per_user
+    )
+    if result.status == services.ALREADY_ANSWERED:
+        record_progress(request, contestant, question.id)
+        return redirect("question_detail", question_id=question.id)
+    if result.status == services.LIMIT_REACHED:
+        clear_progress(request)
+        return redirect("question_detail", question_id=question.id)
+    record_progress(request, contestant, question.id)
+
+    return render(
+        request,
+        "submission_success.html",
+        {
+            "cfg": cfg,
+            "question": question,
+            "contestant": contestant,
+            "remaining": max(0, cfg.total_allowed_answers_per_user - total_answers - 1),
+        },
+    )
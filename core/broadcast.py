@@ -0,0 +1,153 @@
+import asyncio
+import json
+from datetime import timedelta
+from typing import Dict, List, Optional, Set, Tuple
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+
+from .models import LEADERBOARD_ORDERING, ContestantScore, QuizConfig
+
+# Answers committed out of submitted_at order can land just behind the cursor;
+# re-read this much history and dedupe against the last seen answer counts.
+CHANGE_OVERLAP = timedelta(seconds=5)
+
+
+def format_sse(event: str, data) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+class LeaderboardBroadcaster:
+    """Fan leaderboard deltas out to any number of SSE subscribers.
+
+    A single task per process computes changes (two indexed queries per tick:
+    score rows touched since the last tick and the current top N) and pushes
+    the same pre-serialized events to every subscriber queue, so the cost is
+    independent of how many screens are watching. It wakes up as soon as an
+    ``Answer`` is committed in this process (see ``notify``) and also polls
+    every ``LEADERBOARD_STREAM_POLL_SECONDS`` to pick up answers recorded by
+    other worker processes.
+    """
+
+    def __init__(self, top_n: Optional[int] = None, poll_seconds: Optional[float] = None, queue_size: int = 100):
+        self.top_n = top_n or getattr(settings, "LEADERBOARD_STREAM_TOP_N", 20)
+        self.poll_seconds = poll_seconds or getattr(settings, "LEADERBOARD_STREAM_POLL_SECONDS", 2.0)
+        self.queue_size = queue_size
+        self._subscribers: Set[asyncio.Queue] = set()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._cursor = None
+        self._seen: Dict[str, Tuple[int, int]] = {}
+        self._top: List[list] = []
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+    async def subscribe(self) -> asyncio.Queue:
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            # First subscriber in this event loop: (re)initialise loop-bound state.
+            self._loop = loop
+            self._wakeup = asyncio.Event()
+            self._task = None
+        if self._task is None or self._task.done():
+            if self._cursor is None:
+                await self._refresh()
+            self._task = loop.create_task(self._run())
+        self._subscribers.add(queue)
+        queue.put_nowait(format_sse("ranks", self._top))
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue) -> None:
+        self._subscribers.discard(queue)
+
+    def notify(self) -> None:
+        """Wake the broadcaster; safe to call from any thread (e.g. a sync view)."""
+        loop, wakeup = self._loop, self._wakeup
+        if loop is None or wakeup is None or not self._subscribers or loop.is_closed():
+            return
+        loop.call_soon_threadsafe(wakeup.set)
+
+    async def _run(self) -> None:
+        while self._subscribers:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_seconds)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            if not self._subscribers:
+                break
+            for event in await self._refresh():
+                self._publish(event)
+        self._task = None
+
+    def _publish(self, event: str) -> None:
+        for queue in list(self._subscribers):
+            try:
+                queue.put_nowait(event)
+            except asyncio.QueueFull:
+                # A stalled client; drop it rather than buffer without bound.
+                self._subscribers.discard(queue)
+
+    async def _refresh(self) -> List[str]:
+        return await sync_to_async(self._compute_events)()
+
+    def _compute_events(self) -> List[str]:
+        cfg = QuizConfig.get_solo()
+        events = []
+
+        changed = ContestantScore.objects.all()
+        if self._cursor is not None:
+            changed = changed.filter(last_answer__gt=self._cursor - CHANGE_OVERLAP)
+        else:
+            changed = changed.none()
+        for nickname, answer_count, correct_count, last_answer in changed.values_list(
+            "nickname", "answer_count", "correct_count", "last_answer"
+        ):
+            previous = self._seen.get(nickname)
+            if previous == (answer_count, correct_count):
+                continue
+            self._seen[nickname] = (answer_count, correct_count)
+            events.append(
+                format_sse(
+                    "score",
+                    {
+                        "nickname": nickname,
+                        "answer_count": answer_count,
+                        "correct_count": correct_count,
+                        # Unknown (null) for contestants first seen since this process started.
+                        "new_correct": correct_count > previous[1] if previous else None,
+                    },
+                )
+            )
+            if self._cursor is None or last_answer > self._cursor:
+                self._cursor = last_answer
+
+        top = [
+            [rank, nickname, correct_count, (ref_time - cfg.quiz_started_at).total_seconds() if ref_time else None]
+            for rank, (nickname, correct_count, ref_time) in enumerate(
+                ContestantScore.objects.order_by(*LEADERBOARD_ORDERING).values_list(
+                    "nickname", "correct_count", "ref_time"
+                )[: self.top_n],
+                start=1,
+            )
+        ]
+        if top != self._top:
+            self._top = top
+            events.append(format_sse("ranks", top))
+
+        if self._cursor is None:
+            latest = (
+                ContestantScore.objects.filter(last_answer__isnull=False)
+                .order_by("-last_answer")
+                .values_list("last_answer", flat=True)
+                .first()
+            )
+            self._cursor = latest or cfg.quiz_started_at
+        return events
+
+
+broadcaster = LeaderboardBroadcaster()
@@ -0,0 +1,232 @@
+import uuid
+from typing import Dict, Iterable, NamedTuple, Optional, Tuple
+from uuid import UUID
+
+from asgiref.sync import sync_to_async
+from django import forms
+from django.core.cache import cache
+from django.http import Http404
+
+from .models import Choice, Question
+
+# Bump the prefix whenever QuestionBundle's slots change so stale pickles are ignored.
+QUESTION_BUNDLE_KEY = "quiz_hunt:question:v4:{id}:{version}"
+QUESTION_BUNDLE_VERSION_KEY = "quiz_hunt:question:version:{id}"
+
+# str(question id) -> (version stamp, bundle), so a warm worker pays one cache lookup.
+_bundle_local: Dict[str, Tuple[str, "QuestionBundle"]] = {}
+
+
+class ChoiceEntry(NamedTuple):
+    id: UUID
+    text: str
+    is_correct: bool
+
+
+class ImageEntry(NamedTuple):
+    src: str
+    srcset_webp: str
+    srcset_jpeg: str
+    width: Optional[int]
+    height: Optional[int]
+
+    @classmethod
+    def from_image(cls, image) -> "ImageEntry":
+        variants = image.variants or {}
+        if variants.get("source") != image.image.name or not variants.get("jpeg"):
+            # Not processed yet: fall back to the original upload.
+            return cls(image.image.url, "", "", None, None)
+        storage = image.image.storage
+
+        def srcset(key):
+            return ", ".join(f"{storage.url(name)} {width}w" for width, name in variants.get(key, ()))
+
+        width, name = variants["jpeg"][-1]
+        return cls(
+            storage.url(name),
+            srcset("webp"),
+            srcset("jpeg"),
+            width,
+            round(variants["height"] * width / variants["width"]),
+        )
+
+
+class QuestionBundle:
+    """Everything needed to render or grade a question, cached as one compact object.
+
+    Questions are effectively immutable during an event, so the bundle is built
+    once with ``prefetch_related`` and cached under a per-question version
+    stamp that signals replace whenever the question, one of its choices or one
+    of its images changes (see ``invalidate_question_bundle``).
+
+    ``version`` is ``Question.version`` (creation time plus edit counter); it
+    keys the template fragment caches and the question ETags, so an edit never
+    serves stale content.
+    """
+
+    __slots__ = ("id", "title", "body", "is_active", "choices", "images", "version")
+
+    def __init__(
+        self,
+        id,
+        title,
+        body,
+        is_active,
+        choices: Tuple[ChoiceEntry, ...],
+        images: Tuple[ImageEntry, ...],
+        version: str,
+    ):
+        self.id = id
+        self.title = title
+        self.body = body
+        self.is_active = is_active
+        self.choices = choices
+        self.images = images
+        self.version = version
+
+    def __getstate__(self):
+        return tuple(getattr(self, name) for name in self.__slots__)
+
+    def __setstate__(self, state):
+        for name, value in zip(self.__slots__, state):
+            setattr(self, name, value)
+
+    def __str__(self) -> str:
+        return self.title
+
+    @classmethod
+    def from_question(cls, question: Question) -> "QuestionBundle":
+        return cls(
+            id=question.id,
+            title=question.title,
+            body=question.body,
+            is_active=question.is_active,
+            choices=tuple(ChoiceEntry(c.id, c.text, c.is_correct) for c in question.choices.all()),
+            images=tuple(ImageEntry.from_image(img) for img in question.images.all()),
+            version=question.version,
+        )
+
+    @property
+    def correct_choice(self) -> Optional[ChoiceEntry]:
+        for choice in self.choices:
+            if choice.is_correct:
+                return choice
+        return None
+
+    def get_choice(self, choice_id) -> ChoiceEntry:
+        for choice in self.choices:
+            if choice.id == choice_id:
+                return choice
+        raise forms.ValidationError("Invalid choice.")
+
+
+def _version_key(question_id) -> str:
+    return QUESTION_BUNDLE_VERSION_KEY.format(id=question_id)
+
+
+def _bundle_key(question_id, version: str) -> str:
+    return QUESTION_BUNDLE_KEY.format(id=question_id, version=version)
+
+
+def get_question_bundles(question_ids: Iterable) -> Dict[UUID, QuestionBundle]:
+    """Return bundles for the given question ids, building any cache misses in one query.
+
+    A bundle is only cached under a version stamp that was read before the
+    database (or that this call created), so one built from rows an edit has
+    since replaced lands under a stamp nobody reads again. Stamps are created
+    only for questions that exist: unknown ids never add cache entries.
+    """
+    question_ids = set(question_ids)
+    version_keys = {_version_key(qid): qid for qid in question_ids}
+    versions = {version_keys[key]: version for key, version in cache.get_many(version_keys.keys()).items()}
+    bundles = {}
+    for qid, version in versions.items():
+        local = _bundle_local.get(str(qid))
+        if local is not None and local[0] == version:
+            bundles[qid] = local[1]
+    keys = {_bundle_key(qid, version): qid for qid, version in versions.items() if qid not in bundles}
+    cached = cache.get_many(keys.keys()) if keys else {}
+    for key, bundle in cached.items():
+        bundles[keys[key]] = bundle
+    missing = [qid for qid in question_ids if qid not in bundles]
+    if missing:
+        built = {}
+        ids = {str(qid): qid for qid in missing}
+        for question in Question.objects.filter(id__in=missing).prefetch_related("choices", "images"):
+            qid = ids[str(question.id)]
+            bundle = bundles[qid] = QuestionBundle.from_question(question)
+            if qid not in versions:
+                stamp = uuid.uuid4().hex
+                if not cache.add(_version_key(qid), stamp, None):
+                    continue  # an edit stamped it since our read; serve, but don't cache
+                versions[qid] = stamp
+            built[_bundle_key(qid, versions[qid])] = bundle
+        if built:
+            cache.set_many(built, None)
+    for qid, bundle in bundles.items():
+        if qid in versions:
+            _bundle_local[str(qid)] = (versions[qid], bundle)
+    return bundles
+
+
+def get_question_bundle(question_id) -> Optional[QuestionBundle]:
+    return get_question_bundles([question_id]).get(question_id)
+
+
+def get_active_bundle_or_404(question_id) -> QuestionBundle:
+    bundle = get_question_bundle(question_id)
+    if bundle is None or not bundle.is_active:
+        raise Http404("No active question matches the given id.")
+    return bundle
+
+
+async def aget_active_bundle_or_404(question_id) -> QuestionBundle:
+    """Async ``get_active_bundle_or_404``; only a cache miss leaves the event loop."""
+    bundle = None
+    version = await cache.aget(_version_key(question_id))
+    if version is not None:
+        local = _bundle_local.get(str(question_id))
+        if local is not None and local[0] == version:
+            bundle = local[1]
+        else:
+            bundle = await cache.aget(_bundle_key(question_id, version))
+            if bundle is not None:
+                _bundle_local[str(question_id)] = (version, bundle)
+    if bundle is None:
+        bundle = (await sync_to_async(get_question_bundles)([question_id])).get(question_id)
+    if bundle is None or not bundle.is_active:
+        raise Http404("No active question matches the given id.")
+    return bundle
+
+
+def correct_choice_texts(question_ids: Iterable, use_cache: bool = False) -> Dict[UUID, str]:
+    """Map each question id to its correct choice's text ("" when none is marked).
+
+    Issues a single query for any number of questions; with ``use_cache`` the
+    cached bundles are consulted instead and only misses hit the database.
+    """
+    question_ids = set(question_ids)
+    if use_cache:
+        bundles = get_question_bundles(question_ids)
+        mapping = {}
+        for qid in question_ids:
+            choice = bundles[qid].correct_choice if qid in bundles else None
+            mapping[qid] = choice.text if choice else ""
+        return mapping
+    mapping = dict.fromkeys(question_ids, "")
+    if question_ids:
+        rows = Choice.objects.filter(question_id__in=question_ids, is_correct=True).values_list("question_id", "text")
+        for qid, text in rows:
+            if not mapping[qid]:
+                mapping[qid] = text
+    return mapping
+
+
+def invalidate_question_bundle(question_id) -> None:
+    """Retire the question's cached bundle by giving it a new version stamp.
+
+    Call only once the change is committed (signals use ``on_commit``);
+    otherwise a concurrent reader could cache the old rows under the new stamp.
+    """
+    cache.set(_version_key(question_id), uuid.uuid4().hex, None)
+    _bundle_local.pop(str(question_id), None)
@@ -0,0 +1,60 @@
+from functools import wraps
+from hashlib import md5
+
+from django.conf import settings
+from django.contrib.auth import SESSION_KEY
+from django.core.cache import cache
+from django.http import HttpRequest, HttpResponse
+
+from .middleware import SESSION_AUTH_USER_ID
+
+PAGE_CACHE_KEY = "quiz_hunt:page:{digest}"
+
+
+def _is_anonymous(request: HttpRequest) -> bool:
+    # Session keys only: resolving the contestant or staff user would cost a query.
+    session = getattr(request, "session", None)
+    if session is None:
+        return True
+    return SESSION_AUTH_USER_ID not in session and SESSION_KEY not in session
+
+
+def cache_page_for_anonymous(timeout=None):
+    """Serve a view's rendered GET response from the cache for anonymous visitors.
+
+    Unlike ``cache_page`` the entry does not vary on the session cookie, so every
+    anonymous visitor shares it. Contestants and staff always get a fresh render
+    (the header shows who is logged in), and a response is only stored when it
+    is a plain 200 that set no cookies and did not use a CSRF token. Requests
+    with a query string bypass the cache, so arbitrary ``?x=...`` URLs cannot
+    fill it and crowd out sessions.
+    """
+
+    def decorator(view):
+        @wraps(view)
+        def wrapped(request: HttpRequest, *args, **kwargs):
+            if request.method not in ("GET", "HEAD") or request.GET or not _is_anonymous(request):
+                return view(request, *args, **kwargs)
+
+            seconds = timeout if timeout is not None else getattr(settings, "PAGE_CACHE_SECONDS", 60)
+            key = PAGE_CACHE_KEY.format(digest=md5(request.path.encode()).hexdigest())
+            cached = cache.get(key)
+            if cached is not None:
+                content, content_type = cached
+                return HttpResponse(content, content_type=content_type)
+
+            response = view(request, *args, **kwargs)
+            if hasattr(response, "render") and callable(response.render):
+                response = response.render()
+            if (
+                response.status_code == 200
+                and not response.streaming
+                and not response.cookies
+                and not request.META.get("CSRF_COOKIE_NEEDS_UPDATE")
+            ):
+                cache.set(key, (response.content, response["Content-Type"]), seconds)
+            return response
+
+        return wrapped
+
+    return decorator
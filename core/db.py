@@ -0,0 +1,55 @@
+import threading
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import models
+from django.db.models.expressions import OrderBy
+
+# Re-entrant: on_commit callbacks of a serialized transaction run while the
+# lock is still held, and may run tasks that write (TASKS_RUNNER="immediate").
+_write_lock = threading.RLock()
+
+
+def configure_sqlite(sender, connection, **kwargs):
+    """Apply ``SQLITE_PRAGMAS`` to every new SQLite connection (connection_created hook)."""
+    if connection.vendor != "sqlite":
+        return
+    pragmas = getattr(settings, "SQLITE_PRAGMAS", {})
+    if pragmas:
+        with connection.cursor() as cursor:
+            for name, value in pragmas.items():
+                cursor.execute(f"PRAGMA {name} = {value}")
+
+
+@contextmanager
+def serialized_writes():
+    """Funnel write transactions through one in-process queue when ``SQLITE_SERIALIZE_WRITES`` is set.
+
+    SQLite allows a single writer at a time; letting threads queue on a lock
+    here is cheaper than having them spin on the database's busy handler.
+    Only serializes within one process, so pair it with a single worker.
+    """
+    if not getattr(settings, "SQLITE_SERIALIZE_WRITES", False):
+        yield
+        return
+    with _write_lock:
+        yield
+
+
+class NullsFirstIndex(models.Index):
+    """An expression index that may contain ``F(...).asc(nulls_first=True)``.
+
+    PostgreSQL needs the modifier to serve ``ORDER BY ... NULLS FIRST`` from the
+    index. SQLite rejects it in CREATE INDEX but already puts NULLs first in
+    ascending order, so there it is dropped.
+    """
+
+    def create_sql(self, model, schema_editor, using="", **kwargs):
+        index = self
+        if schema_editor.connection.vendor == "sqlite":
+            index = self.clone()
+            index.expressions = tuple(
+                OrderBy(e.expression) if isinstance(e, OrderBy) and e.nulls_first and not e.descending else e
+                for e in self.expressions
+            )
+        return super(NullsFirstIndex, index).create_sql(model, schema_editor, using=using, **kwargs)
@@ -0,0 +1,132 @@
+import csv
+import json
+from datetime import datetime
+from itertools import islice
+from typing import AsyncIterator, Iterable, Iterator, Optional, Sequence
+
+from asgiref.sync import sync_to_async
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .models import LEADERBOARD_ORDERING, Answer, ContestantScore
+
+ANSWER_HEADER = (
+    "submitted_at",
+    "nickname",
+    "name",
+    "school_name",
+    "question_id",
+    "question",
+    "selected_choice",
+    "is_correct",
+)
+STANDINGS_HEADER = (
+    "rank",
+    "nickname",
+    "name",
+    "school_name",
+    "correct_count",
+    "answer_count",
+    "elapsed_seconds",
+)
+
+
+def parse_export_datetime(value: Optional[str]) -> Optional[datetime]:
+    """Parse an ISO 8601 bound; naive values are taken in the current time zone."""
+    if not value:
+        return None
+    parsed = parse_datetime(value)
+    if parsed is None:
+        raise ValueError(f"Invalid datetime: {value!r}")
+    if timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed)
+    return parsed
+
+
+def answer_rows(
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    question_ids: Optional[Sequence] = None,
+    chunk_size: int = 2000,
+) -> Iterator[tuple]:
+    """Answers joined with contestant, question and choice, streamed in ``submitted_at`` order."""
+    answers = Answer.objects.all()
+    if since:
+        answers = answers.filter(submitted_at__gte=since)
+    if until:
+        answers = answers.filter(submitted_at__lt=until)
+    if question_ids:
+        answers = answers.filter(question_id__in=question_ids)
+    return (
+        answers.order_by("submitted_at")
+        .values_list(
+            "submitted_at",
+            "contestant__nickname",
+            "contestant__name",
+            "contestant__school_name",
+            "question_id",
+            "question__title",
+            "selected_choice__text",
+            "is_correct",
+        )
+        .iterator(chunk_size=chunk_size)
+    )
+
+
+def standings_rows(quiz_started_at: datetime, chunk_size: int = 2000) -> Iterator[tuple]:
+    """Final standings in leaderboard order, with rank and elapsed seconds."""
+    rows = (
+        ContestantScore.objects.order_by(*LEADERBOARD_ORDERING)
+        .values_list("nickname", "contestant__name", "contestant__school_name", "correct_count", "answer_count", "ref_time")
+        .iterator(chunk_size=chunk_size)
+    )
+    for rank, (nickname, name, school, correct, answered, ref_time) in enumerate(rows, start=1):
+        elapsed = (ref_time - quiz_started_at).total_seconds() if ref_time else None
+        yield rank, nickname, name, school, correct, answered, elapsed
+
+
+class _Echo:
+    def write(self, value):
+        return value
+
+
+def _serialize(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value) if value is not None and not isinstance(value, (bool, int, float, str)) else value
+
+
+def csv_lines(header: Sequence[str], rows: Iterable[tuple]) -> Iterator[str]:
+    writer = csv.writer(_Echo())
+    yield writer.writerow(header)
+    for row in rows:
+        yield writer.writerow([_serialize(value) for value in row])
+
+
+def jsonl_lines(header: Sequence[str], rows: Iterable[tuple]) -> Iterator[str]:
+    for row in rows:
+        yield json.dumps(dict(zip(header, (_serialize(value) for value in row)))) + "\n"
+
+
+async def aiter_chunks(lines: Iterator[str], lines_per_chunk: int = 500) -> AsyncIterator[str]:
+    """Feed a blocking line iterator to an async response, one chunk of lines per thread hop.
+
+    Under ASGI Django would read a sync iterator into a list before sending
+    it. The hops are thread-sensitive, so the database cursor stays on one
+    thread and connection.
+    """
+
+    def next_chunk() -> str:
+        return "".join(islice(lines, lines_per_chunk))
+
+    while True:
+        chunk = await sync_to_async(next_chunk)()
+        if not chunk:
+            return
+        yield chunk
+
+
+FORMATS = {
+    "csv": (csv_lines, "text/csv; charset=utf-8"),
+    "jsonl": (jsonl_lines, "application/x-ndjson; charset=utf-8"),
+}
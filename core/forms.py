@@ -1,12 +1,26 @@
 import random
 import string
 import uuid
-from typing import Tuple
+from typing import Optional, Tuple
 
 from django import forms
-from django.utils.text import slugify
+from django.db import IntegrityError, transaction
 
-from .models import Contestant, Choice, Question
+from .bundles import ChoiceEntry, QuestionBundle
+from .db import serialized_writes
+from .models import Contestant
+from .nicknames import base_nickname, next_free_nickname
+from .throttling import (
+    ais_pin_login_throttled,
+    aregister_pin_failure,
+    areset_pin_failures,
+    is_pin_login_throttled,
+    register_pin_failure,
+    reset_pin_failures,
+)
+
+THROTTLED_MESSAGE = "Too many attempts. Please wait a few minutes and try again."
+INVALID_LOGIN_MESSAGE = "Invalid nickname or PIN."
 
 
 def _generate_pin() -> str:
@@ -21,21 +35,23 @@ class RegistrationForm(forms.Form):
     school_name = forms.CharField(max_length=150)
     phone_number = forms.CharField(max_length=15, required=False)
 
+    max_nickname_attempts = 5
+
     def clean(self):
         cleaned = super().clean()
         name = cleaned.get("name", "").strip()
         school = cleaned.get("school_name", "").strip()
         if name and school:
-            base_slug = slugify(f"{name}-{school}")[:70]
-            slug = base_slug
-            idx = 2
-            while Contestant.objects.filter(nickname=slug).exists():
-                suffix = f"-{idx}"
-                slug = (base_slug[: (80 - len(suffix))] + suffix)
-                idx += 1
-            cleaned["nickname"] = slug
+            cleaned["nickname"] = self._allocate_nickname(base_nickname(name, school))
         return cleaned
 
+    @staticmethod
+    def _allocate_nickname(base_slug: str) -> str:
+        # Every candidate (base, base-2, ...) starts with the base slug, so one
+        # prefix query is enough to pick the next free suffix in Python.
+        taken = set(Contestant.objects.filter(nickname__startswith=base_slug).values_list("nickname", flat=True))
+        return next_free_nickname(base_slug, taken)
+
     def save(self) -> type_save_return:
         cleaned = self.cleaned_data
         contestant = Contestant(
@@ -46,26 +62,75 @@ class RegistrationForm(forms.Form):
         )
         raw_pin = _generate_pin()
         contestant.set_pin(raw_pin)
-        contestant.save()
+        for attempt in range(self.max_nickname_attempts):
+            try:
+                with serialized_writes(), transaction.atomic():
+                    contestant.save(force_insert=True)
+                break
+            except IntegrityError:
+                # Someone with the same name and school registered concurrently and
+                # took the nickname; allocate again against the current state.
+                if attempt == self.max_nickname_attempts - 1:
+                    raise
+                contestant.nickname = self._allocate_nickname(base_nickname(contestant.name, contestant.school_name))
         return contestant, raw_pin
 
 
+def authenticate_contestant(nickname: str, pin_code: Optional[str], remote_addr: Optional[str]) -> Contestant:
+    """Return the contestant for a nickname + PIN pair or raise ``ValidationError``."""
+    if is_pin_login_throttled(nickname, remote_addr):
+        raise forms.ValidationError(THROTTLED_MESSAGE)
+    try:
+        contestant = Contestant.objects.get(nickname=nickname)
+    except Contestant.DoesNotExist:
+        register_pin_failure(nickname, remote_addr)
+        raise forms.ValidationError(INVALID_LOGIN_MESSAGE)
+    if pin_code:
+        if not contestant.check_pin(pin_code):
+            register_pin_failure(nickname, remote_addr)
+            raise forms.ValidationError(INVALID_LOGIN_MESSAGE)
+        reset_pin_failures(nickname)
+    return contestant
+
+
+async def aauthenticate_contestant(nickname: str, pin_code: Optional[str], remote_addr: Optional[str]) -> Contestant:
+    """Async ``authenticate_contestant`` for async views."""
+    if await ais_pin_login_throttled(nickname, remote_addr):
+        raise forms.ValidationError(THROTTLED_MESSAGE)
+    try:
+        contestant = await Contestant.objects.aget(nickname=nickname)
+    except Contestant.DoesNotExist:
+        await aregister_pin_failure(nickname, remote_addr)
+        raise forms.ValidationError(INVALID_LOGIN_MESSAGE)
+    if pin_code:
+        if not await contestant.acheck_pin(pin_code):
+            await aregister_pin_failure(nickname, remote_addr)
+            raise forms.ValidationError(INVALID_LOGIN_MESSAGE)
+        await areset_pin_failures(nickname)
+    return contestant
+
+
 class NicknameGateForm(forms.Form):
+    """Nickname + PIN login.
+
+    With ``authenticate=False`` only the fields are validated; the caller then
+    runs ``aauthenticate_contestant`` itself (used by the async views).
+    """
+
     nickname = forms.SlugField(max_length=80)
     pin_code = forms.CharField(min_length=6, max_length=6)
 
+    def __init__(self, *args, remote_addr: Optional[str] = None, authenticate: bool = True, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.remote_addr = remote_addr
+        self.authenticate = authenticate
+
     def clean(self):
         cleaned = super().clean()
         nickname = cleaned.get("nickname")
-        pin_code = cleaned.get("pin_code")
         contestant = None
-        if nickname:
-            try:
-                contestant = Contestant.objects.get(nickname=nickname)
-            except Contestant.DoesNotExist:
-                raise forms.ValidationError("Invalid nickname or PIN.")
-        if contestant and pin_code and not contestant.check_pin(pin_code):
-            raise forms.ValidationError("Invalid nickname or PIN.")
+        if nickname and self.authenticate:
+            contestant = authenticate_contestant(nickname, cleaned.get("pin_code"), self.remote_addr)
         cleaned["contestant_obj"] = contestant
         return cleaned
 
@@ -73,15 +138,12 @@ class NicknameGateForm(forms.Form):
 class AnswerForm(forms.Form):
     choice_id = forms.UUIDField()
 
-    def __init__(self, question: Question, *args, **kwargs):
+    def __init__(self, question: QuestionBundle, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.question = question
 
-    def get_choice(self) -> Choice:
+    def get_choice(self) -> ChoiceEntry:
         choice_id = self.cleaned_data.get("choice_id")
         if not choice_id:
             raise forms.ValidationError("Invalid choice.")
-        try:
-            return self.question.choices.get(id=choice_id)
-        except Choice.DoesNotExist:
-            raise forms.ValidationError("Invalid choice.")
+        return self.question.get_choice(choice_id)
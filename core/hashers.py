@@ -0,0 +1,39 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+from django.conf import settings
+from django.contrib.auth.hashers import PBKDF2PasswordHasher
+
+_pin_executor: Optional[ThreadPoolExecutor] = None
+_pin_executor_lock = threading.Lock()
+
+
+class PinPBKDF2PasswordHasher(PBKDF2PasswordHasher):
+    """PBKDF2 for contestant PINs, with a work factor tunable via ``PIN_HASH_ITERATIONS``.
+
+    A 6-digit PIN has only a million candidates, so a high iteration count buys
+    little against offline attacks while costing hundreds of milliseconds per
+    login; online guessing is limited by ``core.throttling`` instead.
+    """
+
+    algorithm = "pin_pbkdf2_sha256"
+
+    @property
+    def iterations(self) -> int:
+        return getattr(settings, "PIN_HASH_ITERATIONS", 50_000)
+
+
+def get_pin_hash_executor() -> ThreadPoolExecutor:
+    """Bounded pool for PIN hashing from async views (``PIN_HASH_WORKERS``, default one per CPU).
+
+    PBKDF2 releases the GIL, so the pool spreads hashing over the cores while
+    capping how many logins hash at once; the event loop never blocks on it.
+    """
+    global _pin_executor
+    with _pin_executor_lock:
+        if _pin_executor is None:
+            workers = getattr(settings, "PIN_HASH_WORKERS", None) or os.cpu_count() or 2
+            _pin_executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="pin-hash")
+    return _pin_executor
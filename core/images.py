@@ -0,0 +1,112 @@
+import logging
+import os
+from hashlib import sha256
+from io import BytesIO
+from typing import Dict, Iterable, Optional
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from PIL import Image, ImageOps
+
+from .bundles import invalidate_question_bundle
+from .models import Question, QuestionImage
+
+logger = logging.getLogger(__name__)
+
+VARIANTS_DIR = "question_images/variants/"
+
+# Pillow format name, file extension and encoder options per variant format.
+VARIANT_FORMATS = {
+    "webp": ("WEBP", "webp", {"quality": 80, "method": 4}),
+    "jpeg": ("JPEG", "jpg", {"quality": 82, "optimize": True, "progressive": True}),
+}
+
+
+def variant_widths(original_width: int) -> list:
+    """Configured widths narrower than the original, plus the original capped at the largest one."""
+    configured = sorted(getattr(settings, "QUESTION_IMAGE_WIDTHS", (320, 640, 1280)))
+    widths = [w for w in configured if w < original_width]
+    largest = min(original_width, configured[-1])
+    if largest not in widths:
+        widths.append(largest)
+    return widths
+
+
+def _prepare(img: Image.Image, fmt: str) -> Image.Image:
+    has_alpha = img.mode in ("RGBA", "LA") or (img.mode == "P" and "transparency" in img.info)
+    if fmt == "JPEG":
+        if has_alpha:
+            rgba = img.convert("RGBA")
+            flattened = Image.new("RGB", rgba.size, (255, 255, 255))
+            flattened.paste(rgba, mask=rgba.getchannel("A"))
+            return flattened
+        return img.convert("RGB")
+    return img.convert("RGBA" if has_alpha else "RGB")
+
+
+def build_variants(field_file) -> Dict:
+    """Write resized WebP and JPEG copies of an uploaded image and describe them.
+
+    The source is rotated according to its EXIF orientation and re-encoded
+    without any metadata. Each file is named after a hash of its bytes, so a
+    URL never changes content and can be cached forever.
+    """
+    storage = field_file.storage
+    stem = os.path.splitext(os.path.basename(field_file.name))[0][:40]
+    with field_file.open("rb") as handle, Image.open(handle) as source:
+        source = ImageOps.exif_transpose(source)
+        source.load()
+    width, height = source.size
+
+    variants: Dict = {"source": field_file.name, "width": width, "height": height}
+    for key, (fmt, ext, options) in VARIANT_FORMATS.items():
+        prepared = _prepare(source, fmt)
+        entries = []
+        for target in variant_widths(width):
+            resized = prepared
+            if target < width:
+                resized = prepared.resize((target, max(1, round(height * target / width))), Image.LANCZOS)
+            buffer = BytesIO()
+            resized.save(buffer, fmt, **options)
+            data = buffer.getvalue()
+            name = f"{VARIANTS_DIR}{stem}-{target}w-{sha256(data).hexdigest()[:16]}.{ext}"
+            if not storage.exists(name):
+                name = storage.save(name, ContentFile(data))
+            entries.append([target, name])
+        variants[key] = entries
+    return variants
+
+
+def variant_names(variants: Dict) -> set:
+    return {name for key in VARIANT_FORMATS for _, name in variants.get(key, ())}
+
+
+def delete_variant_files(storage, names: Iterable[str]) -> None:
+    for name in names:
+        try:
+            storage.delete(name)
+        except OSError:
+            logger.warning("Could not delete image variant %s", name)
+
+
+def process_question_image(image_id) -> Optional[Dict]:
+    """Build variants for one QuestionImage and store them on the row.
+
+    Returns the new variants, or None when the row is gone or its upload was
+    replaced while processing (the replacement schedules its own run).
+    """
+    image = QuestionImage.objects.filter(pk=image_id).first()
+    if image is None or not image.image:
+        return None
+    storage = image.image.storage
+    previous = variant_names(image.variants or {})
+    variants = build_variants(image.image)
+    updated = QuestionImage.objects.filter(pk=image_id, image=image.image.name).update(variants=variants)
+    current = variant_names(variants)
+    if not updated:
+        delete_variant_files(storage, current - previous)
+        return None
+    delete_variant_files(storage, previous - current)
+    Question.bump_edit_count(image.question_id)
+    invalidate_question_bundle(image.question_id)
+    return variants
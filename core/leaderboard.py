@@ -0,0 +1,60 @@
+from datetime import datetime
+from typing import List, NamedTuple, Optional
+
+from django.core import signing
+from django.db.models import DurationField, ExpressionWrapper, F, Q
+
+from .models import LEADERBOARD_ORDERING, ContestantScore
+
+CURSOR_SALT = "quiz_hunt.leaderboard"
+
+
+class LeaderboardPage(NamedTuple):
+    rows: List[ContestantScore]
+    next_cursor: Optional[str]
+
+
+def encode_cursor(row: ContestantScore, rank: int) -> str:
+    ref_time = row.ref_time.isoformat() if row.ref_time else None
+    return signing.dumps([row.correct_count, ref_time, row.nickname, rank], salt=CURSOR_SALT, compress=True)
+
+
+def decode_cursor(token: str):
+    """Return ``(correct_count, ref_time, nickname, rank)``; raises ``signing.BadSignature`` if tampered."""
+    correct_count, ref_time, nickname, rank = signing.loads(token, salt=CURSOR_SALT)
+    return int(correct_count), datetime.fromisoformat(ref_time) if ref_time else None, nickname, int(rank)
+
+
+def _after(correct_count: int, ref_time: Optional[datetime], nickname: str) -> Q:
+    """Rows strictly after the given key in (-correct_count, ref_time NULLS FIRST, nickname) order."""
+    if ref_time is None:
+        same_count_after = Q(ref_time__isnull=False) | Q(ref_time__isnull=True, nickname__gt=nickname)
+    else:
+        same_count_after = Q(ref_time__gt=ref_time) | Q(ref_time=ref_time, nickname__gt=nickname)
+    return Q(correct_count__lt=correct_count) | (Q(correct_count=correct_count) & same_count_after)
+
+
+def leaderboard_page(quiz_started_at, cursor: Optional[str] = None, search: str = "", limit: int = 50) -> LeaderboardPage:
+    """One page of the leaderboard via keyset pagination on the leaderboard index.
+
+    Each page costs one index range scan of ``limit + 1`` rows regardless of
+    how deep it is. Rows get a ``rank`` attribute (position within the listing,
+    i.e. within the search results when searching) and an ``elapsed`` duration.
+    """
+    rows = ContestantScore.objects.annotate(
+        elapsed=ExpressionWrapper(F("ref_time") - quiz_started_at, output_field=DurationField())
+    )
+    if search:
+        rows = rows.filter(Q(nickname__icontains=search) | Q(contestant__school_name__icontains=search))
+    rank = 0
+    if cursor:
+        correct_count, ref_time, nickname, rank = decode_cursor(cursor)
+        rows = rows.filter(_after(correct_count, ref_time, nickname))
+    rows = list(rows.order_by(*LEADERBOARD_ORDERING)[: limit + 1])
+
+    has_next = len(rows) > limit
+    rows = rows[:limit]
+    for offset, row in enumerate(rows, start=1):
+        row.rank = rank + offset
+    next_cursor = encode_cursor(rows[-1], rows[-1].rank) if has_next and rows else None
+    return LeaderboardPage(rows, next_cursor)
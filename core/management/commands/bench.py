@@ -0,0 +1,32 @@
+import json
+
+from django.core.management.base import BaseCommand
+
+from benchmarks import use_scratch_database
+from benchmarks.flow import add_arguments, format_summary, run_flow
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed throwaway questions and drive the contestant flow (register, gate, view, submit) "
+        "concurrently, reporting p50/p95/p99 latency, throughput and queries per view. Runs against a "
+        "throwaway SQLite database unless --live-database is given."
+    )
+
+    def add_arguments(self, parser):
+        add_arguments(parser)
+
+    def handle(self, *args, **options):
+        if not options["live_database"]:
+            use_scratch_database()
+        result = run_flow(
+            contestants=options["contestants"],
+            questions=options["questions"],
+            concurrency=options["concurrency"],
+            keep=options["keep"],
+        )
+        self.stdout.write(format_summary(result))
+        if options["output"]:
+            with open(options["output"], "w") as handle:
+                json.dump(result, handle, indent=2)
+            self.stdout.write(self.style.SUCCESS(f"Wrote {options['output']}"))
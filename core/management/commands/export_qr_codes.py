@@ -0,0 +1,33 @@
+import os
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.models import Question
+from core.qr import get_base_url, render_question_sheets
+
+
+class Command(BaseCommand):
+    help = "Render QR codes for all active questions into a printable PDF or a ZIP of PNGs."
+
+    def add_arguments(self, parser):
+        parser.add_argument("output", help="Path of the .pdf or .zip file to write.")
+        parser.add_argument("--format", choices=["pdf", "zip"], default=None, help="Defaults to the output's extension.")
+        parser.add_argument("--base-url", default=None, help="e.g. http://192.168.1.10:8000 (default: detected local IP).")
+        parser.add_argument("--box-size", type=int, default=10)
+        parser.add_argument("--workers", type=int, default=None, help="Rendering processes (default: one per CPU).")
+
+    def handle(self, *args, **options):
+        output = options["output"]
+        fmt = options["format"] or output.rsplit(".", 1)[-1].lower()
+        if fmt not in ("pdf", "zip"):
+            raise CommandError("Cannot infer format from output path; pass --format pdf|zip.")
+
+        questions = Question.objects.filter(is_active=True).order_by("created_at")
+        if not questions.exists():
+            raise CommandError("There are no active questions.")
+        base_url = (options["base_url"] or get_base_url()).rstrip("/")
+        workers = options["workers"] or os.cpu_count() or 1
+        data = render_question_sheets(questions, base_url, fmt=fmt, box_size=options["box_size"], workers=workers)
+        with open(output, "wb") as handle:
+            handle.write(data)
+        self.stdout.write(self.style.SUCCESS(f"Wrote {questions.count()} QR codes for {base_url} to {output}."))
@@ -0,0 +1,46 @@
+import sys
+from uuid import UUID
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.exports import ANSWER_HEADER, FORMATS, STANDINGS_HEADER, answer_rows, parse_export_datetime, standings_rows
+from core.models import QuizConfig
+
+
+class Command(BaseCommand):
+    help = "Stream answers or final standings to CSV or JSON Lines with flat memory use."
+
+    def add_arguments(self, parser):
+        parser.add_argument("dataset", choices=["answers", "standings"])
+        parser.add_argument("--format", choices=sorted(FORMATS), default="csv")
+        parser.add_argument("--output", "-o", default="-", help="Output file (default: stdout).")
+        parser.add_argument("--since", help="Only answers submitted at or after this ISO 8601 time.")
+        parser.add_argument("--until", help="Only answers submitted before this ISO 8601 time.")
+        parser.add_argument("--question", action="append", default=[], help="Question id; may be repeated.")
+        parser.add_argument("--chunk-size", type=int, default=2000)
+
+    def handle(self, *args, **options):
+        if options["dataset"] == "answers":
+            try:
+                since = parse_export_datetime(options["since"])
+                until = parse_export_datetime(options["until"])
+            except ValueError as exc:
+                raise CommandError(str(exc))
+            try:
+                question_ids = [UUID(value) for value in options["question"]]
+            except ValueError:
+                raise CommandError(f"Invalid question id in {options['question']!r}.")
+            header = ANSWER_HEADER
+            rows = answer_rows(since, until, question_ids, chunk_size=options["chunk_size"])
+        else:
+            header = STANDINGS_HEADER
+            rows = standings_rows(QuizConfig.get_solo().quiz_started_at, chunk_size=options["chunk_size"])
+
+        render_lines, _ = FORMATS[options["format"]]
+        handle = sys.stdout if options["output"] == "-" else open(options["output"], "w", newline="", encoding="utf-8")
+        try:
+            for line in render_lines(header, rows):
+                handle.write(line)
+        finally:
+            if handle is not sys.stdout:
+                handle.close()
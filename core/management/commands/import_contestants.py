@@ -0,0 +1,119 @@
+import csv
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+import django
+from django.contrib.auth.hashers import make_password
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from core.forms import _generate_pin
+from core.models import Contestant, ContestantScore, phone_validator, pin_hasher_name
+from core.nicknames import base_nickname, next_free_nickname
+
+
+def _init_worker():
+    django.setup()
+
+
+def _hash_pin(raw_pin: str) -> str:
+    return make_password(raw_pin, hasher=pin_hasher_name())
+
+
+class Command(BaseCommand):
+    help = (
+        "Pre-register contestants from a CSV with name, school_name and optional "
+        "phone_number columns, and write nickname/PIN slips as CSV."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("csv_path", help="Input CSV file, or '-' for stdin.")
+        parser.add_argument("--output", "-o", default="-", help="Where to write the slips CSV (default: stdout).")
+        parser.add_argument("--batch-size", type=int, default=500)
+        parser.add_argument("--workers", type=int, default=None, help="Hashing processes (default: CPU count).")
+
+    def handle(self, *args, **options):
+        rows = self._read_rows(options["csv_path"])
+        if not rows:
+            raise CommandError("No contestants found in input.")
+
+        taken = set(Contestant.objects.values_list("nickname", flat=True))
+        contestants = []
+        pins = []
+        for row in rows:
+            nickname = next_free_nickname(base_nickname(row["name"], row["school_name"]), taken)
+            taken.add(nickname)
+            contestants.append(
+                Contestant(
+                    name=row["name"],
+                    school_name=row["school_name"],
+                    phone_number=row["phone_number"],
+                    nickname=nickname,
+                )
+            )
+            pins.append(_generate_pin())
+
+        workers = options["workers"] or os.cpu_count() or 1
+        chunksize = max(1, len(pins) // (workers * 8))
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+            for contestant, pin_hash in zip(contestants, pool.map(_hash_pin, pins, chunksize=chunksize)):
+                contestant.pin_hash = pin_hash
+
+        batch_size = options["batch_size"]
+        with transaction.atomic():
+            Contestant.objects.bulk_create(contestants, batch_size=batch_size)
+            # bulk_create bypasses post_save, so create the leaderboard rows here.
+            ContestantScore.objects.bulk_create(
+                [ContestantScore(contestant=c, nickname=c.nickname) for c in contestants],
+                batch_size=batch_size,
+            )
+
+        self._write_slips(options["output"], contestants, pins)
+        self.stderr.write(self.style.SUCCESS(f"Imported {len(contestants)} contestants."))
+
+    def _read_rows(self, path):
+        handle = sys.stdin if path == "-" else open(path, newline="", encoding="utf-8-sig")
+        try:
+            reader = csv.DictReader(handle)
+            missing = {"name", "school_name"} - set(reader.fieldnames or ())
+            if missing:
+                raise CommandError(f"Missing CSV columns: {', '.join(sorted(missing))}")
+            rows, errors = [], []
+            for line_no, raw in enumerate(reader, start=2):
+                row = {
+                    "name": (raw.get("name") or "").strip(),
+                    "school_name": (raw.get("school_name") or "").strip(),
+                    "phone_number": (raw.get("phone_number") or "").strip(),
+                }
+                if not row["name"] or not row["school_name"]:
+                    errors.append(f"line {line_no}: name and school_name are required")
+                    continue
+                if len(row["name"]) > 100 or len(row["school_name"]) > 150:
+                    errors.append(f"line {line_no}: name or school_name too long")
+                    continue
+                if row["phone_number"]:
+                    try:
+                        phone_validator(row["phone_number"])
+                    except ValidationError:
+                        errors.append(f"line {line_no}: invalid phone number")
+                        continue
+                rows.append(row)
+        finally:
+            if handle is not sys.stdin:
+                handle.close()
+        if errors:
+            raise CommandError("Invalid input, nothing imported:\n" + "\n".join(errors))
+        return rows
+
+    def _write_slips(self, path, contestants, pins):
+        handle = self.stdout if path == "-" else open(path, "w", newline="", encoding="utf-8")
+        try:
+            writer = csv.writer(handle)
+            writer.writerow(["nickname", "pin", "name", "school_name"])
+            for contestant, pin in zip(contestants, pins):
+                writer.writerow([contestant.nickname, pin, contestant.name, contestant.school_name])
+        finally:
+            if handle is not self.stdout:
+                handle.close()
@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+
+from core.images import process_question_image
+from core.models import QuestionImage
+
+
+class Command(BaseCommand):
+    help = "Build resized WebP/JPEG variants for question images that do not have them yet."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--all", action="store_true", help="Rebuild variants for every image.")
+
+    def handle(self, *args, **options):
+        processed = 0
+        for image in QuestionImage.objects.only("id", "image", "variants").iterator():
+            if not image.image:
+                continue
+            if not options["all"] and (image.variants or {}).get("source") == image.image.name:
+                continue
+            if process_question_image(image.id) is not None:
+                processed += 1
+        self.stdout.write(self.style.SUCCESS(f"Processed {processed} question images."))
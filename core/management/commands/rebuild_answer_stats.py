@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from core.stats import rebuild_answer_stats
+
+
+class Command(BaseCommand):
+    help = "Rebuild the per-question and per-choice answer counters from Answer rows."
+
+    def handle(self, *args, **options):
+        count = rebuild_answer_stats()
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt answer statistics from {count} answers."))
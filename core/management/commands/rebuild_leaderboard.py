@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from core.models import ContestantScore
+
+
+class Command(BaseCommand):
+    help = "Rebuild the materialized leaderboard (ContestantScore) from Answer rows."
+
+    def handle(self, *args, **options):
+        count = ContestantScore.rebuild()
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {count} leaderboard rows."))
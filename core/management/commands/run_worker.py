@@ -0,0 +1,29 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from core.taskqueue import run_pending
+
+
+class Command(BaseCommand):
+    help = "Run queued background tasks (core.taskqueue) until interrupted."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--poll", type=float, default=1.0, help="Seconds to sleep when the queue is empty.")
+        parser.add_argument("--once", action="store_true", help="Run every due task once, then exit.")
+
+    def handle(self, *args, **options):
+        total = 0
+        try:
+            while True:
+                close_old_connections()
+                ran = run_pending()
+                total += ran
+                if options["once"]:
+                    break
+                if not ran:
+                    time.sleep(options["poll"])
+        except KeyboardInterrupt:
+            pass
+        self.stdout.write(self.style.SUCCESS(f"Ran {total} tasks."))
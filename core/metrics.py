@@ -0,0 +1,141 @@
+import logging
+import threading
+import time
+from collections import Counter, defaultdict
+from typing import Dict, List
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connection
+from django.http import HttpRequest
+
+logger = logging.getLogger(__name__)
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class _ViewStats:
+    __slots__ = ("count", "latency_sum", "buckets", "queries", "db_seconds", "n_plus_one")
+
+    def __init__(self):
+        self.count = 0
+        self.latency_sum = 0.0
+        self.buckets = [0] * len(LATENCY_BUCKETS)
+        self.queries = 0
+        self.db_seconds = 0.0
+        self.n_plus_one = 0
+
+
+class MetricsRegistry:
+    """Per-process request metrics keyed by URL name."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._views: Dict[str, _ViewStats] = defaultdict(_ViewStats)
+
+    def observe(self, view: str, seconds: float, queries: int, db_seconds: float, n_plus_one: bool) -> None:
+        with self._lock:
+            stats = self._views[view]
+            stats.count += 1
+            stats.latency_sum += seconds
+            for i, bound in enumerate(LATENCY_BUCKETS):
+                if seconds <= bound:
+                    stats.buckets[i] += 1
+            stats.queries += queries
+            stats.db_seconds += db_seconds
+            if n_plus_one:
+                stats.n_plus_one += 1
+
+    def reset(self) -> None:
+        with self._lock:
+            self._views.clear()
+
+    def render_prometheus(self) -> str:
+        """Render all metrics in the Prometheus text exposition format."""
+        with self._lock:
+            views = sorted(self._views.items())
+            lines: List[str] = [
+                "# HELP quiz_hunt_requests_total Requests handled, by URL name.",
+                "# TYPE quiz_hunt_requests_total counter",
+            ]
+            lines += [f'quiz_hunt_requests_total{{view="{v}"}} {s.count}' for v, s in views]
+            lines += [
+                "# HELP quiz_hunt_request_duration_seconds Request latency, by URL name.",
+                "# TYPE quiz_hunt_request_duration_seconds histogram",
+            ]
+            for v, s in views:
+                for bound, hits in zip(LATENCY_BUCKETS, s.buckets):
+                    lines.append(f'quiz_hunt_request_duration_seconds_bucket{{view="{v}",le="{bound}"}} {hits}')
+                lines.append(f'quiz_hunt_request_duration_seconds_bucket{{view="{v}",le="+Inf"}} {s.count}')
+                lines.append(f'quiz_hunt_request_duration_seconds_sum{{view="{v}"}} {s.latency_sum:.6f}')
+                lines.append(f'quiz_hunt_request_duration_seconds_count{{view="{v}"}} {s.count}')
+            lines += [
+                "# HELP quiz_hunt_db_queries_total Database queries issued, by URL name.",
+                "# TYPE quiz_hunt_db_queries_total counter",
+            ]
+            lines += [f'quiz_hunt_db_queries_total{{view="{v}"}} {s.queries}' for v, s in views]
+            lines += [
+                "# HELP quiz_hunt_db_seconds_total Time spent in database queries, by URL name.",
+                "# TYPE quiz_hunt_db_seconds_total counter",
+            ]
+            lines += [f'quiz_hunt_db_seconds_total{{view="{v}"}} {s.db_seconds:.6f}' for v, s in views]
+            lines += [
+                "# HELP quiz_hunt_n_plus_one_requests_total Requests that repeated one SQL statement shape many times.",
+                "# TYPE quiz_hunt_n_plus_one_requests_total counter",
+            ]
+            lines += [f'quiz_hunt_n_plus_one_requests_total{{view="{v}"}} {s.n_plus_one}' for v, s in views]
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+
+class _QueryCollector:
+    __slots__ = ("count", "seconds", "shapes")
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+        self.shapes: Counter = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.seconds += time.perf_counter() - start
+            self.count += 1
+            # Parameters are passed separately, so the SQL text is already the statement's shape.
+            self.shapes[sql] += 1
+
+
+class MetricsMiddleware:
+    """Record request count, latency, DB queries and DB time per URL name.
+
+    Removed from the middleware chain entirely (``MiddlewareNotUsed``) unless
+    ``METRICS_ENABLED`` is set, so it costs nothing when switched off.
+    """
+
+    def __init__(self, get_response):
+        if not getattr(settings, "METRICS_ENABLED", False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.n_plus_one_threshold = getattr(settings, "METRICS_N_PLUS_ONE_THRESHOLD", 5)
+
+    def __call__(self, request: HttpRequest):
+        collector = _QueryCollector()
+        start = time.perf_counter()
+        with connection.execute_wrapper(collector):
+            response = self.get_response(request)
+        elapsed = time.perf_counter() - start
+
+        match = getattr(request, "resolver_match", None)
+        view = (match.url_name or match.view_name) if match else "unresolved"
+        n_plus_one = False
+        if collector.shapes:
+            shape, repeats = collector.shapes.most_common(1)[0]
+            if repeats >= self.n_plus_one_threshold:
+                n_plus_one = True
+                logger.warning("Possible N+1 in %s: %d x %s", view, repeats, shape[:200])
+        registry.observe(view, elapsed, collector.count, collector.seconds, n_plus_one)
+        return response
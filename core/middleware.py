@@ -0,0 +1,129 @@
+from typing import Optional, Set
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.core.exceptions import ValidationError
+from django.http import HttpRequest
+from django.utils.functional import SimpleLazyObject
+
+from .models import Answer, Contestant
+
+SESSION_AUTH_USER_ID = "auth_user_id"
+SESSION_PROGRESS = "contestant_progress"
+
+
+def get_contestant(request: HttpRequest) -> Optional[Contestant]:
+    """Resolve the session's contestant at most once per request."""
+    if not hasattr(request, "_cached_contestant"):
+        contestant = None
+        contestant_id = request.session.get(SESSION_AUTH_USER_ID)
+        if contestant_id:
+            try:
+                contestant = Contestant.objects.get(id=contestant_id)
+            except (Contestant.DoesNotExist, ValidationError):
+                contestant = None
+        request._cached_contestant = contestant
+    return request._cached_contestant
+
+
+async def asession_get(request: HttpRequest, key: str, default=None):
+    """Read a session key from async code, loading the session without blocking the loop.
+
+    Once loaded the session is plain in-memory data, so later reads and writes
+    (and the sync helpers below) are safe from async views.
+    """
+    session = request.session
+    if hasattr(session, "aget"):
+        return await session.aget(key, default)
+    return await sync_to_async(session.get)(key, default)
+
+
+async def aget_contestant(request: HttpRequest) -> Optional[Contestant]:
+    """Async ``get_contestant``; shares its per-request memo with ``request.contestant``."""
+    if not hasattr(request, "_cached_contestant"):
+        contestant = None
+        contestant_id = await asession_get(request, SESSION_AUTH_USER_ID)
+        if contestant_id:
+            try:
+                contestant = await Contestant.objects.aget(id=contestant_id)
+            except (Contestant.DoesNotExist, ValidationError):
+                contestant = None
+        request._cached_contestant = contestant
+    return request._cached_contestant
+
+
+class ContestantMiddleware:
+    """Attach the logged-in contestant (or None) lazily as ``request.contestant``.
+
+    Sync and async capable, so async views are not pushed onto a thread by it.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request: HttpRequest):
+        if self.is_async:
+            return self.__acall__(request)
+        request.contestant = SimpleLazyObject(lambda: get_contestant(request))
+        return self.get_response(request)
+
+    async def __acall__(self, request: HttpRequest):
+        request.contestant = SimpleLazyObject(lambda: get_contestant(request))
+        return await self.get_response(request)
+
+
+class ContestantProgress:
+    """Answered question ids for a contestant, cached in the session."""
+
+    __slots__ = ("answered",)
+
+    def __init__(self, answered: Set[str]):
+        self.answered = answered
+
+    @property
+    def answer_count(self) -> int:
+        return len(self.answered)
+
+    def has_answered(self, question_id) -> bool:
+        return str(question_id) in self.answered
+
+
+def get_progress(request: HttpRequest, contestant: Contestant) -> ContestantProgress:
+    data = request.session.get(SESSION_PROGRESS)
+    if not data or data.get("contestant") != str(contestant.id):
+        answered = [str(qid) for qid in Answer.objects.filter(contestant=contestant).values_list("question_id", flat=True)]
+        data = {"contestant": str(contestant.id), "answered": answered}
+        request.session[SESSION_PROGRESS] = data
+    return ContestantProgress(set(data["answered"]))
+
+
+async def aget_progress(request: HttpRequest, contestant: Contestant) -> ContestantProgress:
+    """Async ``get_progress``."""
+    data = await asession_get(request, SESSION_PROGRESS)
+    if not data or data.get("contestant") != str(contestant.id):
+        answered = [
+            str(qid) async for qid in Answer.objects.filter(contestant=contestant).values_list("question_id", flat=True)
+        ]
+        data = {"contestant": str(contestant.id), "answered": answered}
+        request.session[SESSION_PROGRESS] = data
+    return ContestantProgress(set(data["answered"]))
+
+
+def record_progress(request: HttpRequest, contestant: Contestant, question_id) -> None:
+    progress = get_progress(request, contestant)
+    if progress.has_answered(question_id):
+        return
+    progress.answered.add(str(question_id))
+    request.session[SESSION_PROGRESS] = {
+        "contestant": str(contestant.id),
+        "answered": sorted(progress.answered),
+    }
+
+
+def clear_progress(request: HttpRequest) -> None:
+    request.session.pop(SESSION_PROGRESS, None)
@@ -0,0 +1,60 @@
+# Generated by Django 5.2.18 on 2026-10-17 01:49
+
+import django.db.models.deletion
+import uuid
+from django.db import migrations, models
+from django.db.models import Count, Max, Q
+
+
+def populate_scores(apps, schema_editor):
+    Contestant = apps.get_model("core", "Contestant")
+    ContestantScore = apps.get_model("core", "ContestantScore")
+    rows = Contestant.objects.annotate(
+        n_answers=Count("answers"),
+        n_correct=Count("answers", filter=Q(answers__is_correct=True)),
+        max_correct=Max("answers__submitted_at", filter=Q(answers__is_correct=True)),
+        max_answer=Max("answers__submitted_at"),
+    ).values_list("id", "nickname", "n_answers", "n_correct", "max_correct", "max_answer")
+    ContestantScore.objects.bulk_create(
+        [
+            ContestantScore(
+                id=uuid.uuid4(),
+                contestant_id=cid,
+                nickname=nickname,
+                answer_count=n_answers,
+                correct_count=n_correct,
+                last_correct=max_correct,
+                last_answer=max_answer,
+                ref_time=max_correct or max_answer,
+            )
+            for cid, nickname, n_answers, n_correct, max_correct, max_answer in rows
+        ],
+        batch_size=500,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ContestantScore',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('nickname', models.SlugField(max_length=80)),
+                ('answer_count', models.PositiveIntegerField(default=0)),
+                ('correct_count', models.PositiveIntegerField(default=0)),
+                ('last_correct', models.DateTimeField(blank=True, null=True)),
+                ('last_answer', models.DateTimeField(blank=True, null=True)),
+                ('ref_time', models.DateTimeField(blank=True, null=True)),
+                ('contestant', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='score', to='core.contestant')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['-correct_count', 'ref_time', 'nickname'], name='score_leaderboard_idx')],
+            },
+        ),
+        migrations.RunPython(populate_scores, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-17 01:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0002_contestantscore'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='contestantscore',
+            index=models.Index(fields=['last_answer'], name='score_last_answer_idx'),
+        ),
+    ]
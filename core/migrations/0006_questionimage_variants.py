@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-17 02:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0005_answer_submitted_at_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='questionimage',
+            name='variants',
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+    ]
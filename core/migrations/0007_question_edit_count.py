@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-17 02:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0006_questionimage_variants'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='question',
+            name='edit_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+    ]
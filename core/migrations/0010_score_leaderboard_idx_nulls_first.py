@@ -0,0 +1,22 @@
+# Generated by Django 5.2.18 on 2026-10-17 02:29
+
+import core.db
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0009_answer_stats'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='contestantscore',
+            name='score_leaderboard_idx',
+        ),
+        migrations.AddIndex(
+            model_name='contestantscore',
+            index=core.db.NullsFirstIndex(models.OrderBy(models.F('correct_count'), descending=True), models.OrderBy(models.F('ref_time'), nulls_first=True), models.F('nickname'), name='score_leaderboard_idx'),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-17 02:34
+
+import django.utils.timezone
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0010_score_leaderboard_idx_nulls_first'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PinLoginFailure',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('scope', models.CharField(max_length=10)),
+                ('ident', models.CharField(max_length=100)),
+                ('count', models.PositiveIntegerField(default=0)),
+                ('window_start', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('scope', 'ident'), name='unique_pin_failure_scope_ident')],
+            },
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-17 02:57
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0011_pinloginfailure'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='answer',
+            name='answer_contestant_correct_idx',
+        ),
+    ]
@@ -1,12 +1,22 @@
+import asyncio
 import uuid
 from datetime import datetime
+from functools import partial
+from typing import Optional
 
-from django.db import models
+from django.conf import settings
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models, transaction
 from django.core.validators import RegexValidator
 from django.utils.text import slugify
 from django.utils.timezone import now
 from django.contrib.auth.hashers import make_password, check_password
-from django.db.models import Q
+from django.db.models import Q, F, Count, Max, Value
+from django.db.models.functions import Coalesce
+
+from .db import NullsFirstIndex, serialized_writes
+from .hashers import get_pin_hash_executor
 
 
 class BaseUUIDModel(models.Model):
@@ -16,21 +26,80 @@ class BaseUUIDModel(models.Model):
         abstract = True
 
 
+QUIZ_CONFIG_VERSION_KEY = "quiz_hunt:quizconfig:version"
+QUIZ_CONFIG_CACHE_KEY = "quiz_hunt:quizconfig:{version}"
+
+# Process-local copy of the singleton, valid while its version matches the shared one.
+_quiz_config_local = {"version": None, "obj": None}
+
+
 class QuizConfig(BaseUUIDModel):
     total_allowed_answers_per_user = models.PositiveIntegerField(default=10)
     quiz_started_at = models.DateTimeField(default=now)
 
     @classmethod
     def get_solo(cls):
+        """Return the config singleton, served from cache while its version is current.
+
+        The version stamp lives in the shared cache so every worker notices an
+        invalidation; the object itself is also kept process-locally, so a warm
+        worker pays a single cache lookup and no database query.
+        """
+        version = cache.get(QUIZ_CONFIG_VERSION_KEY)
+        if version is None:
+            cache.add(QUIZ_CONFIG_VERSION_KEY, uuid.uuid4().hex, None)
+            version = cache.get(QUIZ_CONFIG_VERSION_KEY)
+        local = _quiz_config_local
+        if local["version"] == version and local["obj"] is not None:
+            return local["obj"]
+        key = QUIZ_CONFIG_CACHE_KEY.format(version=version)
+        obj = cache.get(key)
+        if obj is None:
+            obj = cls._load_solo()
+            cache.set(key, obj, None)
+        local["version"], local["obj"] = version, obj
+        return obj
+
+    @classmethod
+    async def aget_solo(cls):
+        """Async counterpart of ``get_solo`` for async views."""
+        version = await cache.aget(QUIZ_CONFIG_VERSION_KEY)
+        if version is None:
+            await cache.aadd(QUIZ_CONFIG_VERSION_KEY, uuid.uuid4().hex, None)
+            version = await cache.aget(QUIZ_CONFIG_VERSION_KEY)
+        local = _quiz_config_local
+        if local["version"] == version and local["obj"] is not None:
+            return local["obj"]
+        key = QUIZ_CONFIG_CACHE_KEY.format(version=version)
+        obj = await cache.aget(key)
+        if obj is None:
+            obj = await cls.objects.afirst()
+            if not obj:
+                obj = await cls.objects.acreate()
+            await cache.aset(key, obj, None)
+        local["version"], local["obj"] = version, obj
+        return obj
+
+    @classmethod
+    def _load_solo(cls):
         obj = cls.objects.first()
         if not obj:
             obj = cls.objects.create()
         return obj
 
+    @classmethod
+    def invalidate_solo(cls) -> None:
+        cache.set(QUIZ_CONFIG_VERSION_KEY, uuid.uuid4().hex, None)
+        _quiz_config_local["version"] = _quiz_config_local["obj"] = None
+
     def __str__(self) -> str:
         return f"QuizConfig({self.total_allowed_answers_per_user}, {self.quiz_started_at})"
 
 
+def pin_hasher_name() -> str:
+    return getattr(settings, "PIN_PASSWORD_HASHER", "default")
+
+
 phone_validator = RegexValidator(regex=r"^\+?\d{7,15}$", message="Enter a valid phone number.")
 
 
@@ -45,12 +114,50 @@ class Contestant(BaseUUIDModel):
         return self.nickname
 
     def set_pin(self, raw_pin: str) -> None:
-        self.pin_hash = make_password(raw_pin)
+        self.pin_hash = make_password(raw_pin, hasher=pin_hasher_name())
 
     def check_pin(self, raw_pin: str) -> bool:
         if not self.pin_hash:
             return False
-        return check_password(raw_pin, self.pin_hash)
+
+        def rehash(raw: str) -> None:
+            # Existing hashes are moved to the configured PIN hasher/work factor on login.
+            self.set_pin(raw)
+            Contestant.objects.filter(pk=self.pk).update(pin_hash=self.pin_hash)
+
+        return check_password(raw_pin, self.pin_hash, setter=rehash, preferred=pin_hasher_name())
+
+    async def acheck_pin(self, raw_pin: str) -> bool:
+        """Async ``check_pin``: hashing runs on the bounded PIN executor, off the event loop."""
+        if not self.pin_hash:
+            return False
+        loop = asyncio.get_running_loop()
+        executor = get_pin_hash_executor()
+        stale = []
+        valid = await loop.run_in_executor(
+            executor, partial(check_password, raw_pin, self.pin_hash, setter=stale.append, preferred=pin_hasher_name())
+        )
+        if valid and stale:
+            await loop.run_in_executor(executor, self.set_pin, raw_pin)
+            await Contestant.objects.filter(pk=self.pk).aupdate(pin_hash=self.pin_hash)
+        return valid
+
+
+class PinLoginFailure(BaseUUIDModel):
+    """Failed PIN logins for one nickname or IP address within the current window (see ``core.throttling``)."""
+
+    scope = models.CharField(max_length=10)
+    ident = models.CharField(max_length=100)
+    count = models.PositiveIntegerField(default=0)
+    window_start = models.DateTimeField(default=now)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["scope", "ident"], name="unique_pin_failure_scope_ident"),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.scope} {self.ident}: {self.count}"
 
 
 class Question(BaseUUIDModel):
@@ -58,17 +165,51 @@ class Question(BaseUUIDModel):
     body = models.TextField(blank=True)
     is_active = models.BooleanField(default=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    # Bumped on every edit of the question, its choices or its images; see ``version``.
+    edit_count = models.PositiveIntegerField(default=0, editable=False)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["created_at"], condition=Q(is_active=True), name="question_active_idx"),
+        ]
 
     def __str__(self) -> str:
         return self.title
 
+    def save(self, *args, **kwargs):
+        if self._state.adding:
+            super().save(*args, **kwargs)
+            return
+        # Incremented in the database so a concurrent bump_edit_count() is never
+        # overwritten; two different contents must not share a version.
+        self.edit_count = F("edit_count") + 1
+        if kwargs.get("update_fields") is not None:
+            kwargs["update_fields"] = {*kwargs["update_fields"], "edit_count"}
+        super().save(*args, **kwargs)
+        self.refresh_from_db(fields=["edit_count"])
+
+    @property
+    def version(self) -> str:
+        """Changes whenever anything rendered for this question changes (ETags, fragment caches)."""
+        return f"{int(self.created_at.timestamp())}-{self.edit_count}"
+
+    @classmethod
+    def bump_edit_count(cls, question_id) -> None:
+        cls.objects.filter(pk=question_id).update(edit_count=F("edit_count") + 1)
+
     def correct_choice(self):
-        return self.choices.filter(is_correct=True).first()
+        # Iterate so a prefetched ``choices`` cache is used instead of a new query.
+        for choice in self.choices.all():
+            if choice.is_correct:
+                return choice
+        return None
 
 
 class QuestionImage(BaseUUIDModel):
     question = models.ForeignKey(Question, related_name="images", on_delete=models.CASCADE)
     image = models.ImageField(upload_to="question_images/")
+    # Resized, metadata-free copies built by core.images after upload.
+    variants = models.JSONField(default=dict, blank=True, editable=False)
 
     def __str__(self) -> str:
         return f"Image for {self.question.title}"
@@ -79,6 +220,11 @@ class Choice(BaseUUIDModel):
     text = models.CharField(max_length=255)
     is_correct = models.BooleanField(default=False)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["question", "is_correct"], name="choice_question_correct_idx"),
+        ]
+
     def __str__(self) -> str:
         return f"{self.text} ({'✓' if self.is_correct else '✗'})"
 
@@ -89,11 +235,173 @@ class Answer(BaseUUIDModel):
     selected_choice = models.ForeignKey(Choice, on_delete=models.PROTECT)
     is_correct = models.BooleanField()
     submitted_at = models.DateTimeField(auto_now_add=True)
+    # Set once the answer is folded into QuestionStats/ChoiceStats (see core.stats).
+    stats_counted = models.BooleanField(default=False, editable=False)
 
     class Meta:
         constraints = [
             models.UniqueConstraint(fields=["contestant", "question"], name="unique_answer_per_contestant_question"),
         ]
+        indexes = [
+            models.Index(fields=["submitted_at"], name="answer_submitted_at_idx"),
+            models.Index(fields=["submitted_at"], condition=Q(stats_counted=False), name="answer_uncounted_idx"),
+        ]
 
     def __str__(self) -> str:
         return f"{self.contestant.nickname} → {self.question.title} ({'✓' if self.is_correct else '✗'})"
+
+
+class QuestionStats(BaseUUIDModel):
+    """Running answer counters for one question, maintained by ``core.stats``."""
+
+    question = models.OneToOneField(Question, related_name="stats", on_delete=models.CASCADE)
+    answer_count = models.PositiveIntegerField(default=0)
+    correct_count = models.PositiveIntegerField(default=0)
+
+    def __str__(self) -> str:
+        return f"{self.question}: {self.correct_count}/{self.answer_count}"
+
+
+class ChoiceStats(BaseUUIDModel):
+    """Running count of answers that picked one choice, maintained by ``core.stats``."""
+
+    choice = models.OneToOneField(Choice, related_name="stats", on_delete=models.CASCADE)
+    question = models.ForeignKey(Question, related_name="choice_stats", on_delete=models.CASCADE)
+    answer_count = models.PositiveIntegerField(default=0)
+
+    def __str__(self) -> str:
+        return f"{self.choice}: {self.answer_count}"
+
+
+LEADERBOARD_ORDERING = ("-correct_count", F("ref_time").asc(nulls_first=True), "nickname")
+
+
+class ContestantScore(BaseUUIDModel):
+    """Materialized leaderboard row, kept in step with ``Answer`` inserts.
+
+    ``ref_time`` is the last correct submission, or the last submission if none
+    were correct; elapsed time is ``ref_time - quiz_started_at``, so ordering by
+    ``ref_time`` is equivalent and stays valid when the start time is edited.
+    """
+
+    contestant = models.OneToOneField(Contestant, related_name="score", on_delete=models.CASCADE)
+    nickname = models.SlugField(max_length=80)
+    answer_count = models.PositiveIntegerField(default=0)
+    correct_count = models.PositiveIntegerField(default=0)
+    last_correct = models.DateTimeField(null=True, blank=True)
+    last_answer = models.DateTimeField(null=True, blank=True)
+    ref_time = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            # Spelled out to match LEADERBOARD_ORDERING: PostgreSQL sorts NULLs last
+            # by default, and an index in that order cannot serve the keyset pages.
+            NullsFirstIndex(
+                F("correct_count").desc(),
+                F("ref_time").asc(nulls_first=True),
+                "nickname",
+                name="score_leaderboard_idx",
+            ),
+            models.Index(fields=["last_answer"], name="score_last_answer_idx"),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.nickname}: {self.correct_count}/{self.answer_count}"
+
+    @classmethod
+    def record_answer(cls, answer: "Answer", limit: Optional[int] = None) -> int:
+        """Fold a freshly created answer into its contestant's score row.
+
+        With ``limit`` the update only applies while the contestant is under the
+        cap; returns the number of rows updated (0 means capped or no row).
+        """
+        ts = answer.submitted_at
+        changes = {
+            "answer_count": F("answer_count") + 1,
+            "last_answer": ts,
+        }
+        if answer.is_correct:
+            changes.update(correct_count=F("correct_count") + 1, last_correct=ts, ref_time=ts)
+        else:
+            changes["ref_time"] = Coalesce(F("last_correct"), Value(ts))
+        rows = cls.objects.filter(contestant_id=answer.contestant_id)
+        if limit is not None:
+            rows = rows.filter(answer_count__lt=limit)
+        return rows.update(**changes)
+
+    @classmethod
+    def rebuild(cls, contestant_ids=None) -> int:
+        """Recompute score rows from ``Answer``; all contestants when no ids are given.
+
+        The rows are locked before ``Answer`` is read and then updated in place,
+        so a submission committing meanwhile is either already counted or waits
+        for the lock and applies its increment on top of the rebuilt row.
+        """
+        contestants = Contestant.objects.all()
+        existing = cls.objects.all()
+        if contestant_ids is not None:
+            contestants = contestants.filter(id__in=contestant_ids)
+            existing = existing.filter(contestant_id__in=contestant_ids)
+        with serialized_writes(), transaction.atomic():
+            # A no-op UPDATE rather than select_for_update(): besides the row
+            # locks it takes SQLite's write lock, which SELECT ... FOR UPDATE cannot.
+            existing.update(answer_count=F("answer_count"))
+            current = dict(existing.values_list("contestant_id", "pk"))
+            rows = contestants.annotate(
+                n_answers=Count("answers"),
+                n_correct=Count("answers", filter=Q(answers__is_correct=True)),
+                max_correct=Max("answers__submitted_at", filter=Q(answers__is_correct=True)),
+                max_answer=Max("answers__submitted_at"),
+            ).values_list("id", "nickname", "n_answers", "n_correct", "max_correct", "max_answer")
+
+            updated, created = [], []
+            for cid, nickname, n_answers, n_correct, max_correct, max_answer in rows:
+                score = cls(
+                    contestant_id=cid,
+                    nickname=nickname,
+                    answer_count=n_answers,
+                    correct_count=n_correct,
+                    last_correct=max_correct,
+                    last_answer=max_answer,
+                    ref_time=max_correct or max_answer,
+                )
+                if cid in current:
+                    score.pk = current[cid]
+                    updated.append(score)
+                else:
+                    created.append(score)
+            cls.objects.bulk_update(
+                updated,
+                ["nickname", "answer_count", "correct_count", "last_correct", "last_answer", "ref_time"],
+                batch_size=500,
+            )
+            cls.objects.bulk_create(created, batch_size=500, ignore_conflicts=True)
+        return len(updated) + len(created)
+
+
+class Task(BaseUUIDModel):
+    """A queued background job (see ``core.taskqueue``); deleted once it succeeds."""
+
+    PENDING = "pending"
+    RUNNING = "running"
+    FAILED = "failed"
+    STATUS_CHOICES = [(PENDING, "Pending"), (RUNNING, "Running"), (FAILED, "Failed")]
+
+    name = models.CharField(max_length=100)
+    kwargs = models.JSONField(default=dict, blank=True, encoder=DjangoJSONEncoder)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=PENDING)
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=5)
+    run_at = models.DateTimeField(default=now)
+    # Lease held by the worker running the task; an expired lease makes it claimable again.
+    locked_until = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["status", "run_at"], name="task_due_idx"),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.name} ({self.status}, attempt {self.attempts}/{self.max_attempts})"
@@ -0,0 +1,21 @@
+from typing import Set
+
+from django.utils.text import slugify
+
+NICKNAME_MAX_LENGTH = 80
+BASE_NICKNAME_LENGTH = 70
+
+
+def base_nickname(name: str, school_name: str) -> str:
+    return slugify(f"{name}-{school_name}")[:BASE_NICKNAME_LENGTH] or "contestant"
+
+
+def next_free_nickname(base_slug: str, taken: Set[str]) -> str:
+    """First of ``base``, ``base-2``, ``base-3``, ... that is not in ``taken``."""
+    slug = base_slug
+    idx = 2
+    while slug in taken:
+        suffix = f"-{idx}"
+        slug = base_slug[: (NICKNAME_MAX_LENGTH - len(suffix))] + suffix
+        idx += 1
+    return slug
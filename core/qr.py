@@ -0,0 +1,190 @@
+import hashlib
+import io
+import socket
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from typing import Iterable, List, Sequence, Tuple
+
+import qrcode
+from django.conf import settings
+from django.core.cache import cache
+from django.urls import reverse
+from django.utils.text import slugify
+
+QR_CACHE_KEY = "quiz_hunt:qr:{question_id}:{base}:{box_size}"
+QR_CACHE_TIMEOUT = 60 * 60 * 24
+
+
+@lru_cache(maxsize=None)
+def get_local_ip_address():
+    """
+    Get the local IP address of the machine running the server.
+    Returns the first non-loopback IPv4 address found.
+    Resolved once per process, since probing opens sockets.
+    """
+    try:
+        # Method 1: Connect to external address to determine active interface
+        # This is the most reliable method - determines which interface would route to internet
+        s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        try:
+            # Doesn't actually connect, just determines which interface would be used
+            s.connect(('8.8.8.8', 80))
+            ip = s.getsockname()[0]
+            s.close()
+            if ip and ip != '127.0.0.1':
+                return ip
+        except (socket.error, OSError):
+            pass
+        finally:
+            s.close()
+    except (socket.error, OSError):
+        pass
+    
+    # Method 2: Try to get IP from hostname
+    try:
+        hostname = socket.gethostname()
+        local_ip = socket.gethostbyname(hostname)
+        # Check if it's not loopback
+        if local_ip and local_ip != '127.0.0.1':
+            return local_ip
+    except (socket.error, OSError):
+        pass
+    
+    # Method 3: Check all network interfaces
+    try:
+        # Get all IP addresses associated with hostname
+        addrs = socket.getaddrinfo(socket.gethostname(), None, socket.AF_INET)
+        for addr in addrs:
+            ip = addr[4][0]
+            # Skip loopback and link-local addresses
+            if ip and ip != '127.0.0.1' and not ip.startswith('169.254'):
+                return ip
+    except (socket.error, OSError, AttributeError):
+        pass
+    
+    # Fallback to localhost
+    return '127.0.0.1'
+
+
+def get_base_url(request=None) -> str:
+    """Get the base URL for QR code generation using local IP address."""
+    # First check if explicitly set in settings
+    if hasattr(settings, "QR_CODE_BASE_URL"):
+        return settings.QR_CODE_BASE_URL
+    
+    # Get local IP address
+    local_ip = get_local_ip_address()
+    
+    # Get port from request or use default
+    port = 8000  # Default Django development port
+    scheme = "http"
+    
+    if request:
+        scheme = "https" if request.is_secure() else "http"
+        host = request.get_host()
+        
+        # Extract port from host if present (e.g., "192.168.1.100:8000" or "localhost:8000")
+        if ':' in host:
+            try:
+                port = int(host.split(':')[1])
+            except (ValueError, IndexError):
+                pass
+        else:
+            # Try to get port from server port in request meta
+            server_port = request.META.get('SERVER_PORT')
+            if server_port:
+                try:
+                    port = int(server_port)
+                except (ValueError, TypeError):
+                    pass
+    
+    return f"{scheme}://{local_ip}:{port}"
+
+
+def question_url(question_id, base_url: str) -> str:
+    return f"{base_url}{reverse('question_entrypoint', args=[question_id])}"
+
+
+def _make_qr_image(data: str, box_size: int = 10, border: int = 4):
+    qr = qrcode.QRCode(
+        version=1,
+        error_correction=qrcode.constants.ERROR_CORRECT_L,
+        box_size=box_size,
+        border=border,
+    )
+    qr.add_data(data)
+    qr.make(fit=True)
+    return qr.make_image(fill_color="black", back_color="white").get_image()
+
+
+def render_qr_png(data: str, box_size: int = 10) -> bytes:
+    buffer = io.BytesIO()
+    _make_qr_image(data, box_size).save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+def get_question_qr_png(question_id, base_url: str, box_size: int = 10) -> bytes:
+    """PNG bytes of a question's QR code, cached per (question, base URL, box size)."""
+    base = hashlib.sha1(base_url.encode()).hexdigest()[:16]
+    key = QR_CACHE_KEY.format(question_id=question_id, base=base, box_size=box_size)
+    png = cache.get(key)
+    if png is None:
+        png = render_qr_png(question_url(question_id, base_url), box_size)
+        cache.set(key, png, QR_CACHE_TIMEOUT)
+    return png
+
+
+def _render_sheet(job: Tuple[str, str, int]) -> bytes:
+    """Render one printable page: the QR code with the question title underneath."""
+    from PIL import Image, ImageDraw
+
+    url, title, box_size = job
+    code = _make_qr_image(url, box_size).convert("RGB")
+    margin = box_size * 4
+    page = Image.new("RGB", (code.width + 2 * margin, code.height + 3 * margin), "white")
+    page.paste(code, (margin, margin))
+    draw = ImageDraw.Draw(page)
+    draw.text((margin, code.height + margin + box_size), title[:80], fill="black")
+    draw.text((margin, code.height + 2 * margin), url, fill="black")
+    buffer = io.BytesIO()
+    page.save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+def render_question_sheets(
+    questions: Iterable,
+    base_url: str,
+    fmt: str = "zip",
+    box_size: int = 10,
+    workers: int = 1,
+) -> bytes:
+    """Render QR sheets for many questions as a ZIP of PNGs or one PDF.
+
+    With ``workers`` > 1 the pages are drawn in a process pool. Only the
+    management command does that: forking a web worker that has task threads
+    and open database connections is unsafe, so requests render in-process.
+    """
+    questions: Sequence = list(questions)
+    jobs = [(question_url(q.id, base_url), q.title, box_size) for q in questions]
+    if workers > 1 and len(jobs) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            pages: List[bytes] = list(pool.map(_render_sheet, jobs, chunksize=max(1, len(jobs) // 32)))
+    else:
+        pages = [_render_sheet(job) for job in jobs]
+
+    buffer = io.BytesIO()
+    if fmt == "pdf":
+        from PIL import Image
+
+        images = [Image.open(io.BytesIO(page)) for page in pages]
+        if images:
+            images[0].save(buffer, format="PDF", save_all=True, append_images=images[1:])
+    elif fmt == "zip":
+        with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as archive:
+            for index, (question, page) in enumerate(zip(questions, pages), start=1):
+                name = slugify(question.title)[:50] or str(question.id)
+                archive.writestr(f"{index:03d}-{name}.png", page)
+    else:
+        raise ValueError(f"Unknown QR sheet format: {fmt!r}")
+    return buffer.getvalue()
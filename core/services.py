@@ -0,0 +1,53 @@
+from typing import NamedTuple, Optional
+
+from django.db import IntegrityError, transaction
+
+from .bundles import ChoiceEntry, QuestionBundle
+from .db import serialized_writes
+from .models import Answer, Contestant, ContestantScore
+
+ACCEPTED = "accepted"
+ALREADY_ANSWERED = "already_answered"
+LIMIT_REACHED = "limit_reached"
+
+
+class SubmissionResult(NamedTuple):
+    status: str
+    answer: Optional[Answer] = None
+
+
+class _LimitReached(Exception):
+    pass
+
+
+def submit_answer(contestant: Contestant, question: QuestionBundle, choice: ChoiceEntry, limit: int) -> SubmissionResult:
+    """Record an answer, enforcing the per-contestant cap and one answer per question.
+
+    Runs as a single transaction of two statements: the ``Answer`` INSERT (the
+    unique constraint rejects duplicates) and a conditional UPDATE of the
+    contestant's score row that only succeeds while ``answer_count < limit``.
+    The UPDATE takes the row lock, so concurrent submissions by the same
+    contestant are serialized and can never push the count past the cap.
+    """
+    for attempt in range(2):
+        answer = Answer(
+            contestant=contestant,
+            question_id=question.id,
+            selected_choice_id=choice.id,
+            is_correct=bool(choice.is_correct),
+        )
+        try:
+            with serialized_writes(), transaction.atomic():
+                answer.save(force_insert=True)
+                if not ContestantScore.record_answer(answer, limit=limit):
+                    raise _LimitReached
+        except IntegrityError:
+            return SubmissionResult(ALREADY_ANSWERED)
+        except _LimitReached:
+            if attempt or ContestantScore.objects.filter(contestant=contestant).exists():
+                return SubmissionResult(LIMIT_REACHED)
+            # No score row yet (contestant predates the leaderboard table); build it and retry.
+            ContestantScore.rebuild(contestant_ids=[contestant.id])
+            continue
+        return SubmissionResult(ACCEPTED, answer)
+    return SubmissionResult(LIMIT_REACHED)
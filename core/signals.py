@@ -0,0 +1,109 @@
+import threading
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .broadcast import broadcaster
+from .bundles import invalidate_question_bundle
+from .images import delete_variant_files, variant_names
+from .models import Answer, Choice, Contestant, ContestantScore, Question, QuestionImage, QuizConfig
+from .tasks import process_image, rebuild_scores, recount_stats, rollup_stats
+
+
+@receiver(post_save, sender=Contestant)
+def sync_contestant_score(sender, instance: Contestant, created: bool, raw: bool = False, **kwargs):
+    if raw:
+        return
+    if created:
+        ContestantScore.objects.get_or_create(contestant=instance, defaults={"nickname": instance.nickname})
+    else:
+        ContestantScore.objects.filter(contestant=instance).exclude(nickname=instance.nickname).update(
+            nickname=instance.nickname
+        )
+
+
+@receiver(post_save, sender=Answer)
+def notify_leaderboard_stream(sender, instance: Answer, created: bool, raw: bool = False, **kwargs):
+    if created and not raw:
+        transaction.on_commit(broadcaster.notify)
+
+
+@receiver(post_save, sender=Answer)
+def queue_stats_rollup(sender, instance: Answer, created: bool, raw: bool = False, **kwargs):
+    # After commit, so the pending-task lookup (and the INSERT when none is
+    # pending) stays out of the answer transaction and SQLite's write lock.
+    if created and not raw:
+        transaction.on_commit(rollup_stats.delay)
+
+
+class _AnswerDeletions(threading.local):
+    """Ids touched by answer deletes in this thread, not yet handed to a task."""
+
+    def __init__(self):
+        self.contestant_ids = set()
+        self.question_ids = set()
+
+
+_answer_deletions = _AnswerDeletions()
+
+
+def _queue_answer_deletion_tasks():
+    contestant_ids, _answer_deletions.contestant_ids = _answer_deletions.contestant_ids, set()
+    question_ids, _answer_deletions.question_ids = _answer_deletions.question_ids, set()
+    if contestant_ids:
+        rebuild_scores.delay(contestant_ids=sorted(contestant_ids))
+    if question_ids:
+        recount_stats.delay(question_ids=sorted(question_ids))
+
+
+@receiver(post_delete, sender=Answer)
+def recount_after_answer_delete(sender, instance: Answer, **kwargs):
+    # Deleting a contestant cascades into one signal per answer, so only note
+    # the ids here and queue a single score rebuild and stats recount once the
+    # whole delete commits; rebuild() then finds no contestant and leaves no
+    # orphaned score row. Ids left behind by a rolled-back delete just ride
+    # along with the next batch: both tasks recompute, so that is harmless.
+    _answer_deletions.contestant_ids.add(instance.contestant_id)
+    _answer_deletions.question_ids.add(instance.question_id)
+    transaction.on_commit(_queue_answer_deletion_tasks)
+
+
+@receiver(post_save, sender=QuizConfig)
+@receiver(post_delete, sender=QuizConfig)
+def invalidate_quiz_config(sender, **kwargs):
+    # Bump the version only once the change is visible to other connections,
+    # otherwise a concurrent reader could cache the old row under the new version.
+    transaction.on_commit(QuizConfig.invalidate_solo)
+
+
+@receiver(post_save, sender=Question)
+@receiver(post_delete, sender=Question)
+def invalidate_bundle_for_question(sender, instance: Question, **kwargs):
+    transaction.on_commit(lambda: invalidate_question_bundle(instance.id))
+
+
+@receiver(post_save, sender=Choice)
+@receiver(post_delete, sender=Choice)
+@receiver(post_save, sender=QuestionImage)
+@receiver(post_delete, sender=QuestionImage)
+def invalidate_bundle_for_child(sender, instance, raw: bool = False, **kwargs):
+    question_id = instance.question_id
+    if not raw:
+        Question.bump_edit_count(question_id)
+    transaction.on_commit(lambda: invalidate_question_bundle(question_id))
+
+
+@receiver(post_save, sender=QuestionImage)
+def process_uploaded_image(sender, instance: QuestionImage, raw: bool = False, **kwargs):
+    if raw or not instance.image:
+        return
+    if (instance.variants or {}).get("source") != instance.image.name:
+        process_image.delay(image_id=instance.id)
+
+
+@receiver(post_delete, sender=QuestionImage)
+def delete_image_variants(sender, instance: QuestionImage, **kwargs):
+    storage, names = instance.image.storage, variant_names(instance.variants or {})
+    if names:
+        transaction.on_commit(lambda: delete_variant_files(storage, names))
@@ -0,0 +1,150 @@
+from collections import Counter
+from typing import List, NamedTuple
+
+from django.db import transaction
+from django.db.models import Count, F, FloatField, Q
+from django.db.models.functions import Cast, Coalesce
+
+from .db import serialized_writes
+from .models import Answer, Choice, ChoiceStats, Question, QuestionStats
+
+
+def rollup_answer_stats(batch_size: int = 500) -> int:
+    """Fold answers not yet counted into the per-question and per-choice counters.
+
+    Each answer is claimed by flipping ``stats_counted`` with a conditional
+    UPDATE in the same transaction as the counter increments, so concurrent or
+    repeated runs never count an answer twice. Returns the number counted.
+    """
+    counted = 0
+    while True:
+        candidates = list(
+            Answer.objects.filter(stats_counted=False)
+            .order_by("submitted_at")
+            .values_list("pk", "question_id", "selected_choice_id", "is_correct")[:batch_size]
+        )
+        if not candidates:
+            return counted
+        answers, correct, picks = Counter(), Counter(), Counter()
+        with serialized_writes(), transaction.atomic():
+            for pk, question_id, choice_id, is_correct in candidates:
+                if not Answer.objects.filter(pk=pk, stats_counted=False).update(stats_counted=True):
+                    continue
+                answers[question_id] += 1
+                correct[question_id] += is_correct
+                picks[(question_id, choice_id)] += 1
+            QuestionStats.objects.bulk_create([QuestionStats(question_id=q) for q in answers], ignore_conflicts=True)
+            ChoiceStats.objects.bulk_create(
+                [ChoiceStats(question_id=q, choice_id=c) for q, c in picks], ignore_conflicts=True
+            )
+            for question_id, n in answers.items():
+                QuestionStats.objects.filter(question_id=question_id).update(
+                    answer_count=F("answer_count") + n, correct_count=F("correct_count") + correct[question_id]
+                )
+            for (_, choice_id), n in picks.items():
+                ChoiceStats.objects.filter(choice_id=choice_id).update(answer_count=F("answer_count") + n)
+        counted += sum(answers.values())
+        if len(candidates) < batch_size:
+            return counted
+
+
+def recount_answer_stats(question_ids) -> None:
+    """Recompute the given questions' counters from their counted answers (after deletes).
+
+    The counter rows are locked before ``Answer`` is read, so a rollup
+    committing meanwhile is either already included or adds its increment on
+    top of the recounted value.
+    """
+    with serialized_writes(), transaction.atomic():
+        questions = QuestionStats.objects.filter(question_id__in=question_ids)
+        choices = ChoiceStats.objects.filter(question_id__in=question_ids)
+        questions.update(answer_count=F("answer_count"))
+        choices.update(answer_count=F("answer_count"))
+        counted = Answer.objects.filter(question_id__in=question_ids, stats_counted=True)
+        per_question = {
+            q: (n, c)
+            for q, n, c in counted.values("question_id")
+            .annotate(n=Count("pk"), c=Count("pk", filter=Q(is_correct=True)))
+            .values_list("question_id", "n", "c")
+        }
+        per_choice = dict(
+            counted.values("selected_choice_id").annotate(n=Count("pk")).values_list("selected_choice_id", "n")
+        )
+        question_rows = list(questions)
+        for row in question_rows:
+            row.answer_count, row.correct_count = per_question.get(row.question_id, (0, 0))
+        choice_rows = list(choices)
+        for row in choice_rows:
+            row.answer_count = per_choice.get(row.choice_id, 0)
+        QuestionStats.objects.bulk_update(question_rows, ["answer_count", "correct_count"], batch_size=500)
+        ChoiceStats.objects.bulk_update(choice_rows, ["answer_count"], batch_size=500)
+
+
+def rebuild_answer_stats() -> int:
+    """Recompute every counter from ``Answer`` with GROUP BY; returns the answers counted.
+
+    Meant for repair and backfill. Run it while no rollup is in progress
+    (e.g. with the task workers stopped), since it overwrites the counters.
+    """
+    with serialized_writes(), transaction.atomic():
+        Answer.objects.filter(stats_counted=False).update(stats_counted=True)
+        per_question = Question.objects.annotate(
+            n_answers=Count("answers"), n_correct=Count("answers", filter=Q(answers__is_correct=True))
+        ).values_list("id", "n_answers", "n_correct")
+        per_choice = Choice.objects.annotate(n_answers=Count("answer")).values_list("id", "question_id", "n_answers")
+        question_rows = [QuestionStats(question_id=q, answer_count=n, correct_count=c) for q, n, c in per_question]
+        choice_rows = [ChoiceStats(choice_id=c, question_id=q, answer_count=n) for c, q, n in per_choice]
+        QuestionStats.objects.all().delete()
+        ChoiceStats.objects.all().delete()
+        QuestionStats.objects.bulk_create(question_rows, batch_size=500)
+        ChoiceStats.objects.bulk_create(choice_rows, batch_size=500)
+    return sum(row.answer_count for row in question_rows)
+
+
+class ChoiceShare(NamedTuple):
+    text: str
+    is_correct: bool
+    answer_count: int
+    share: float
+
+
+class QuestionAnalytics(NamedTuple):
+    id: object
+    title: str
+    answer_count: int
+    correct_count: int
+    correct_rate: float
+    choices: List[ChoiceShare]
+
+
+def question_analytics() -> List[QuestionAnalytics]:
+    """Per-question answer counts, correct rate and choice split, hardest first.
+
+    Two queries over the counter tables and choices; the cost depends on the
+    number of questions and choices, not on the number of answers.
+    """
+    questions = list(
+        QuestionStats.objects.filter(answer_count__gt=0)
+        .annotate(rate=Cast("correct_count", FloatField()) / Cast("answer_count", FloatField()))
+        .order_by("rate", "-answer_count")
+        .values_list("question_id", "question__title", "answer_count", "correct_count", "rate")
+    )
+    choices = {}
+    for question_id, text, is_correct, count in (
+        Choice.objects.filter(question_id__in=[row[0] for row in questions])
+        .annotate(picked=Coalesce("stats__answer_count", 0))
+        .order_by("-picked", "text")
+        .values_list("question_id", "text", "is_correct", "picked")
+    ):
+        choices.setdefault(question_id, []).append((text, is_correct, count))
+    return [
+        QuestionAnalytics(
+            question_id,
+            title,
+            answers,
+            correct,
+            rate,
+            [ChoiceShare(text, is_correct, n, n / answers) for text, is_correct, n in choices.get(question_id, [])],
+        )
+        for question_id, title, answers, correct, rate in questions
+    ]
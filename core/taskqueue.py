@@ -0,0 +1,176 @@
+"""A small database-backed task queue; no broker required.
+
+Register a function with ``@task`` and enqueue it with ``func.delay(**kwargs)``.
+The row is written in the caller's transaction, so a task exists exactly when
+the change that triggered it was committed. Workers claim due tasks with a
+conditional UPDATE that takes a lease (``TASKS_LEASE_SECONDS``); a task is
+deleted on success, retried with exponential backoff on failure and marked
+failed after ``max_attempts``. A worker that dies mid-task lets its lease
+expire and another worker runs the task again, so delivery is at-least-once
+and task functions must be idempotent.
+
+``TASKS_RUNNER`` picks who drains the queue:
+
+* ``"thread"`` (default): daemon threads inside each web process, woken on
+  commit and polling every ``TASKS_POLL_SECONDS``;
+* ``"worker"``: only ``manage.py run_worker`` processes;
+* ``"immediate"``: run in the committing thread right after commit (scripts).
+
+``manage.py run_worker`` can run alongside any of them.
+"""
+
+import logging
+import threading
+import traceback
+from datetime import timedelta
+from typing import Callable, Dict, NamedTuple, Optional
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.db.models import F, Q
+from django.utils.timezone import now
+
+from .models import Task
+
+logger = logging.getLogger(__name__)
+
+
+class TaskSpec(NamedTuple):
+    func: Callable
+    max_attempts: int
+    retry_delay: float
+    unique: bool
+
+
+TASKS: Dict[str, TaskSpec] = {}
+
+
+def task(name: Optional[str] = None, max_attempts: int = 5, retry_delay: float = 5.0, unique: bool = False):
+    """Register a task function and give it a ``delay(**kwargs)`` method.
+
+    ``retry_delay`` doubles after each failed attempt. With ``unique`` an
+    identical task that is still pending is reused instead of adding another.
+    Keyword arguments must be JSON-serializable (UUIDs and datetimes arrive as
+    strings).
+    """
+
+    def decorator(func):
+        task_name = name or f"{func.__module__}.{func.__qualname__}"
+        TASKS[task_name] = TaskSpec(func, max_attempts, retry_delay, unique)
+        func.task_name = task_name
+        func.delay = lambda **kwargs: enqueue(task_name, **kwargs)
+        return func
+
+    return decorator
+
+
+def enqueue(task_name: str, **kwargs) -> Task:
+    spec = TASKS[task_name]
+    if spec.unique:
+        pending = Task.objects.filter(name=task_name, kwargs=kwargs, status=Task.PENDING).first()
+        if pending is not None:
+            return pending
+    queued = Task.objects.create(name=task_name, kwargs=kwargs, max_attempts=spec.max_attempts)
+    transaction.on_commit(wake)
+    return queued
+
+
+def _lease_seconds() -> float:
+    return getattr(settings, "TASKS_LEASE_SECONDS", 300)
+
+
+def _claimable(moment):
+    return Q(status=Task.PENDING, run_at__lte=moment) | Q(status=Task.RUNNING, locked_until__lt=moment)
+
+
+def claim_task() -> Optional[Task]:
+    """Lease the oldest due task, or return None when nothing is due."""
+    moment = now()
+    candidates = list(Task.objects.filter(_claimable(moment)).order_by("run_at").values_list("pk", flat=True)[:10])
+    for pk in candidates:
+        claimed = Task.objects.filter(_claimable(moment), pk=pk).update(
+            status=Task.RUNNING,
+            locked_until=moment + timedelta(seconds=_lease_seconds()),
+            attempts=F("attempts") + 1,
+        )
+        if claimed:
+            return Task.objects.get(pk=pk)
+    return None
+
+
+def run_task(queued: Task) -> bool:
+    spec = TASKS.get(queued.name)
+    try:
+        if spec is None:
+            raise LookupError(f"No task registered as {queued.name!r}.")
+        spec.func(**queued.kwargs)
+    except Exception:
+        error = traceback.format_exc()
+        rows = Task.objects.filter(pk=queued.pk)
+        if queued.attempts >= queued.max_attempts:
+            logger.error("Task %s failed permanently after %d attempts", queued.name, queued.attempts)
+            rows.update(status=Task.FAILED, locked_until=None, last_error=error)
+        else:
+            delay = (spec.retry_delay if spec else 5.0) * 2 ** (queued.attempts - 1)
+            logger.warning("Task %s failed (attempt %d), retrying in %.0fs", queued.name, queued.attempts, delay)
+            rows.update(
+                status=Task.PENDING, locked_until=None, last_error=error, run_at=now() + timedelta(seconds=delay)
+            )
+        return False
+    Task.objects.filter(pk=queued.pk).delete()
+    return True
+
+
+def run_pending(max_tasks: Optional[int] = None) -> int:
+    """Run due tasks until none are left (or ``max_tasks`` ran); returns how many ran."""
+    ran = 0
+    while max_tasks is None or ran < max_tasks:
+        queued = claim_task()
+        if queued is None:
+            break
+        run_task(queued)
+        ran += 1
+    return ran
+
+
+class _InProcessRunner:
+    """Daemon threads that drain the queue inside a web process."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._threads = []
+
+    def wake(self) -> None:
+        with self._lock:
+            if not self._threads:
+                for i in range(getattr(settings, "TASKS_THREADS", 1)):
+                    thread = threading.Thread(target=self._loop, name=f"tasks-{i}", daemon=True)
+                    thread.start()
+                    self._threads.append(thread)
+        self._wakeup.set()
+
+    def _loop(self) -> None:
+        poll = getattr(settings, "TASKS_POLL_SECONDS", 2.0)
+        while True:
+            self._wakeup.wait(timeout=poll)
+            self._wakeup.clear()
+            close_old_connections()
+            try:
+                run_pending()
+            except Exception:
+                logger.exception("Task runner iteration failed")
+            finally:
+                close_old_connections()
+
+
+_runner = _InProcessRunner()
+
+
+def wake() -> None:
+    """Tell this process's runner that tasks were committed."""
+    mode = getattr(settings, "TASKS_RUNNER", "thread")
+    if mode == "thread":
+        _runner.wake()
+    elif mode == "immediate":
+        run_pending()
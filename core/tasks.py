@@ -0,0 +1,30 @@
+"""Background tasks; see ``core.taskqueue``. Every task must be safe to run twice."""
+
+from .images import process_question_image
+from .models import ContestantScore
+from .stats import recount_answer_stats, rollup_answer_stats
+from .taskqueue import task
+
+
+@task(unique=True)
+def rebuild_scores(contestant_ids):
+    """Recompute the leaderboard rows of the given contestants from their answers."""
+    ContestantScore.rebuild(contestant_ids=contestant_ids)
+
+
+@task(max_attempts=3, retry_delay=30.0)
+def process_image(image_id):
+    """Build the resized variants of an uploaded question image."""
+    process_question_image(image_id)
+
+
+@task(unique=True)
+def rollup_stats():
+    """Fold newly recorded answers into the per-question and per-choice counters."""
+    rollup_answer_stats()
+
+
+@task(unique=True)
+def recount_stats(question_ids):
+    """Recompute the answer counters of the given questions after answers were deleted."""
+    recount_answer_stats(question_ids)
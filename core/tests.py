@@ -0,0 +1,323 @@
+import threading
+import uuid
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection, connections
+from django.test import AsyncClient, TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+
+from . import services
+from .bundles import QuestionBundle, _bundle_key, _version_key, get_question_bundle
+from .leaderboard import _after
+from .models import (
+    LEADERBOARD_ORDERING,
+    Answer,
+    Choice,
+    ChoiceStats,
+    Contestant,
+    ContestantScore,
+    Question,
+    QuestionStats,
+    Task,
+)
+from .stats import rollup_answer_stats
+from .taskqueue import run_pending
+from .tasks import rebuild_scores, recount_stats, rollup_stats
+
+# Keep tests away from the shared file cache configured for the event.
+LOCMEM_CACHES = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+
+
+# No in-process task threads: they would keep polling the test database after the test.
+@override_settings(CACHES=LOCMEM_CACHES, TASKS_RUNNER="worker")
+class SubmitAnswerConcurrencyTests(TransactionTestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_cap_holds_under_parallel_submits(self):
+        limit, threads = 3, 40
+        contestant = Contestant.objects.create(name="Racer", school_name="Test", nickname="racer")
+        bundles = []
+        for i in range(threads):
+            question = Question.objects.create(title=f"Question {i}")
+            Choice.objects.create(question=question, text="Right", is_correct=True)
+            bundles.append(QuestionBundle.from_question(question))
+
+        start = threading.Barrier(threads)
+        statuses, errors = [], []
+
+        def submit(bundle):
+            try:
+                start.wait()
+                statuses.append(services.submit_answer(contestant, bundle, bundle.choices[0], limit).status)
+            except Exception as error:
+                errors.append(error)
+            finally:
+                connections.close_all()
+
+        workers = [threading.Thread(target=submit, args=(bundle,)) for bundle in bundles]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+
+        self.assertEqual(errors, [])
+        self.assertEqual(statuses.count(services.ACCEPTED), limit)
+        self.assertEqual(statuses.count(services.LIMIT_REACHED), threads - limit)
+        self.assertEqual(contestant.answers.count(), limit)
+        score = ContestantScore.objects.get(contestant=contestant)
+        self.assertEqual((score.answer_count, score.correct_count), (limit, limit))
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class AdminUserDetailQueryTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(User.objects.create_superuser("staff", "staff@example.com", "pw"))
+
+    def _contestant_with_answers(self, nickname, count):
+        contestant = Contestant.objects.create(name=nickname, school_name="Test", nickname=nickname)
+        for i in range(count):
+            question = Question.objects.create(title=f"{nickname} question {i}")
+            right = Choice.objects.create(question=question, text="Right", is_correct=True)
+            wrong = Choice.objects.create(question=question, text="Wrong")
+            Answer.objects.create(
+                contestant=contestant, question=question, selected_choice=wrong if i % 2 else right, is_correct=not i % 2
+            )
+        return contestant
+
+    def test_query_count_does_not_grow_with_answers(self):
+        # Warm the session and config caches so only the view's own queries remain.
+        self.client.get(reverse("admin_user_detail", args=[self._contestant_with_answers("warm", 1).nickname]))
+        for count in (1, 8):
+            contestant = self._contestant_with_answers(f"solver-{count}", count)
+            # User, contestant, answers with their question and choice, correct choices.
+            with self.assertNumQueries(4):
+                response = self.client.get(reverse("admin_user_detail", args=[contestant.nickname]))
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(len(response.context["answers"]), count)
+            self.assertEqual({a.correct_text for a in response.context["answers"]}, {"Right"})
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class IndexPlanTests(TestCase):
+    """Each index serves a query the dashboard or the submit path actually runs."""
+
+    def setUp(self):
+        for i in range(30):
+            Contestant.objects.create(name=f"Player {i}", school_name="Test", nickname=f"player-{i:02d}")
+        self.contestant = Contestant.objects.get(nickname="player-00")
+        self.questions = []
+        for i in range(10):
+            question = Question.objects.create(title=f"Question {i}", is_active=bool(i % 3))
+            right = Choice.objects.create(question=question, text="Right", is_correct=True)
+            Choice.objects.create(question=question, text="Wrong")
+            Answer.objects.create(contestant=self.contestant, question=question, selected_choice=right, is_correct=True)
+            self.questions.append(question)
+
+    def _plan(self, queryset) -> str:
+        if connection.vendor == "postgresql":
+            # The tables are tiny; make the planner show whether an index *can* serve the query.
+            with connection.cursor() as cursor:
+                cursor.execute("SET LOCAL enable_seqscan = off")
+        return queryset.explain()
+
+    def assertUsesIndex(self, queryset, index, sorted_by_index=False):
+        plan = self._plan(queryset)
+        self.assertIn(index, plan)
+        if sorted_by_index and connection.vendor == "sqlite":
+            self.assertNotIn("TEMP B-TREE", plan)
+        elif sorted_by_index and connection.vendor == "postgresql":
+            self.assertNotIn("Sort", plan)
+
+    def test_leaderboard_first_page(self):
+        queryset = ContestantScore.objects.order_by(*LEADERBOARD_ORDERING)[:51]
+        self.assertUsesIndex(queryset, "score_leaderboard_idx", sorted_by_index=True)
+
+    def test_leaderboard_keyset_page(self):
+        rows = ContestantScore.objects.order_by(*LEADERBOARD_ORDERING)
+        queryset = rows.filter(_after(0, None, "player-10"))[:51]
+        self.assertUsesIndex(queryset, "score_leaderboard_idx", sorted_by_index=True)
+
+    def test_correct_choice_lookup(self):
+        # correct_choice_texts(), behind the user detail page and the exports.
+        ids = [question.id for question in self.questions]
+        queryset = Choice.objects.filter(question_id__in=ids, is_correct=True).values_list("question_id", "text")
+        self.assertUsesIndex(queryset, "choice_question_correct_idx")
+
+    def test_active_question_listing(self):
+        # export_qr_codes, which prints the sheets for every active question.
+        queryset = Question.objects.filter(is_active=True).order_by("created_at")
+        self.assertUsesIndex(queryset, "question_active_idx", sorted_by_index=True)
+
+    def test_submit_path_lookups(self):
+        # The answered-question set loaded with the contestant's progress...
+        answered = Answer.objects.filter(contestant=self.contestant).values_list("question_id", flat=True)
+        sqlite = connection.vendor == "sqlite"
+        self.assertUsesIndex(answered, "sqlite_autoindex_core_answer" if sqlite else "unique_answer_per_contestant")
+        # ...and the capped score UPDATE in record_answer(), whose WHERE clause this SELECT shares.
+        score = ContestantScore.objects.filter(contestant_id=self.contestant.id, answer_count__lt=10)
+        self.assertUsesIndex(score, "sqlite_autoindex_core_contestantscore" if sqlite else "contestant_id")
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class QuestionPageETagTests(TestCase):
+    PIN = "123456"
+
+    def setUp(self):
+        cache.clear()
+        self.question = Question.objects.create(title="Where is the key?")
+        Choice.objects.create(question=self.question, text="Under the mat", is_correct=True)
+        Choice.objects.create(question=self.question, text="In the lock")
+        self.url = reverse("question_detail", args=[self.question.id])
+
+    def _login(self, nickname):
+        contestant = Contestant(name=nickname, school_name="Test", nickname=nickname)
+        contestant.set_pin(self.PIN)
+        contestant.save()
+        response = self.client.post(
+            reverse("question_entrypoint", args=[self.question.id]), {"nickname": nickname, "pin_code": self.PIN}
+        )
+        self.assertRedirects(response, self.url, fetch_redirect_response=False)
+
+    def test_unchanged_page_is_not_modified(self):
+        self._login("alice")
+        first = self.client.get(self.url)
+        self.assertEqual(first.status_code, 200)
+        again = self.client.get(self.url, HTTP_IF_NONE_MATCH=first["ETag"])
+        self.assertEqual(again.status_code, 304)
+        self.assertEqual(again["ETag"], first["ETag"])
+
+    def test_edit_changes_etag(self):
+        self._login("alice")
+        etag = self.client.get(self.url)["ETag"]
+        self.question.title = "Where is the spare key?"
+        with self.captureOnCommitCallbacks(execute=True):
+            self.question.save()
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+        self.assertContains(response, "Where is the spare key?")
+
+    def test_other_contestant_does_not_share_etag(self):
+        self._login("alice")
+        etag = self.client.get(self.url)["ETag"]
+        self.client.get(reverse("logout"))
+        self._login("bob")
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "bob")
+
+    def test_edit_count_survives_concurrent_bump(self):
+        stale = Question.objects.get(pk=self.question.pk)
+        before = stale.edit_count
+        Question.bump_edit_count(self.question.pk)  # e.g. an image finished processing meanwhile
+        stale.title = "Edited in the admin"
+        stale.save()
+        self.assertEqual(stale.edit_count, before + 2)
+        self.assertEqual(Question.objects.get(pk=self.question.pk).version, stale.version)
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class QuestionBundleCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.question = Question.objects.create(title="Old title")
+        Choice.objects.create(question=self.question, text="Right", is_correct=True)
+
+    def test_bundle_built_before_an_edit_is_never_served_after_it(self):
+        # A reader looks up the stamp and loads the rows just before an edit commits...
+        get_question_bundle(self.question.id)
+        version = cache.get(_version_key(self.question.id))
+        stale = QuestionBundle.from_question(Question.objects.get(pk=self.question.pk))
+        self.question.title = "New title"
+        with self.captureOnCommitCallbacks(execute=True):
+            self.question.save()
+        # ...and only writes its bundle once the edit's invalidation has run.
+        cache.set(_bundle_key(self.question.id, version), stale, None)
+        self.assertEqual(get_question_bundle(self.question.id).title, "New title")
+
+    def test_unknown_ids_add_no_cache_entries(self):
+        unknown = uuid.uuid4()
+        self.assertIsNone(get_question_bundle(unknown))
+        self.assertIsNone(cache.get(_version_key(unknown)))
+        self.assertEqual(self.client.get(reverse("question_entrypoint", args=[unknown])).status_code, 404)
+        self.assertIsNone(cache.get(_version_key(unknown)))
+
+    def test_choice_change_refreshes_bundle(self):
+        self.assertEqual(len(get_question_bundle(self.question.id).choices), 1)
+        with self.captureOnCommitCallbacks(execute=True):
+            Choice.objects.create(question=self.question, text="Wrong")
+        self.assertEqual(len(get_question_bundle(self.question.id).choices), 2)
+
+
+@override_settings(CACHES=LOCMEM_CACHES, TASKS_RUNNER="worker")
+class StatsRollupQueueTests(TestCase):
+    def test_rollup_is_queued_after_the_answer_commits(self):
+        contestant = Contestant.objects.create(name="Quick", school_name="Test", nickname="quick")
+        for i in range(2):
+            question = Question.objects.create(title=f"Question {i}")
+            Choice.objects.create(question=question, text="Right", is_correct=True)
+            bundle = QuestionBundle.from_question(question)
+            queued = Task.objects.count()
+            with self.captureOnCommitCallbacks(execute=True):
+                self.assertEqual(services.submit_answer(contestant, bundle, bundle.choices[0], 10).status, services.ACCEPTED)
+                self.assertEqual(Task.objects.count(), queued)
+            # Later answers reuse the pending rollup instead of queueing another.
+            self.assertEqual(list(Task.objects.values_list("name", flat=True)), [rollup_stats.task_name])
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class LeaderboardStreamTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.staff = User.objects.create_superuser("staff", "staff@example.com", "pw")
+        self.client.force_login(self.staff)
+
+    def test_wsgi_dashboard_does_not_subscribe(self):
+        self.assertNotContains(self.client.get(reverse("admin_dashboard")), "EventSource(")
+        response = self.client.get(reverse("leaderboard_stream"))
+        self.assertEqual(response.status_code, 204)
+        self.assertFalse(response.streaming)
+
+    async def test_asgi_dashboard_subscribes(self):
+        client = AsyncClient()
+        await client.aforce_login(self.staff)
+        response = await client.get(reverse("admin_dashboard"))
+        self.assertContains(response, "EventSource(")
+
+
+@override_settings(CACHES=LOCMEM_CACHES, TASKS_RUNNER="worker")
+class AnswerDeletionTests(TestCase):
+    def setUp(self):
+        self.people = [Contestant.objects.create(name=f"P{i}", school_name="Test", nickname=f"p{i}") for i in range(2)]
+        self.questions = []
+        for i in range(3):
+            question = Question.objects.create(title=f"Question {i}")
+            right = Choice.objects.create(question=question, text="Right", is_correct=True)
+            for contestant in self.people:
+                Answer.objects.create(contestant=contestant, question=question, selected_choice=right, is_correct=True)
+            self.questions.append(question)
+        rollup_answer_stats()
+        Task.objects.all().delete()
+
+    def test_one_rebuild_is_queued_after_the_delete_commits(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            Answer.objects.filter(question=self.questions[0]).delete()
+            self.assertFalse(Task.objects.exists())
+        rebuilds = Task.objects.filter(name=rebuild_scores.task_name)
+        self.assertEqual(rebuilds.count(), 1)
+        self.assertEqual(set(rebuilds.get().kwargs["contestant_ids"]), {str(c.id) for c in self.people})
+        self.assertEqual(Task.objects.filter(name=recount_stats.task_name).count(), 1)
+
+    def test_contestant_delete_recounts_stats_once(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.people[0].delete()
+        self.assertEqual(len(Task.objects.get(name=recount_stats.task_name).kwargs["question_ids"]), 3)
+        run_pending()
+        for question in self.questions:
+            stats = QuestionStats.objects.get(question=question)
+            self.assertEqual((stats.answer_count, stats.correct_count), (1, 1))
+            self.assertEqual(ChoiceStats.objects.get(choice__question=question, choice__is_correct=True).answer_count, 1)
+        self.assertFalse(ContestantScore.objects.filter(contestant_id=self.people[0].id).exists())
@@ -0,0 +1,85 @@
+from datetime import timedelta
+from typing import Dict, Optional
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import F, Q
+from django.utils.timezone import now
+
+from .models import PinLoginFailure
+
+# Counters live in the database rather than the cache: increments are atomic
+# UPDATEs and a full cache can never evict an attacker's count.
+
+
+def _limits():
+    return {
+        "nickname": getattr(settings, "PIN_LOGIN_MAX_ATTEMPTS_PER_NICKNAME", 5),
+        "ip": getattr(settings, "PIN_LOGIN_MAX_ATTEMPTS_PER_IP", 50),
+    }
+
+
+def _window_start():
+    """Failures recorded before this moment belong to an expired window."""
+    return now() - timedelta(seconds=getattr(settings, "PIN_LOGIN_WINDOW_SECONDS", 300))
+
+
+def _idents(nickname: Optional[str], remote_addr: Optional[str]) -> Dict[str, str]:
+    idents = {}
+    if nickname:
+        idents["nickname"] = nickname
+    if remote_addr:
+        idents["ip"] = remote_addr
+    return idents
+
+
+def _over_limit(nickname: Optional[str], remote_addr: Optional[str]):
+    limits = _limits()
+    match = Q(pk__in=[])
+    for scope, ident in _idents(nickname, remote_addr).items():
+        match |= Q(scope=scope, ident=ident, count__gte=limits[scope])
+    return PinLoginFailure.objects.filter(match, window_start__gt=_window_start())
+
+
+def is_pin_login_throttled(nickname: Optional[str], remote_addr: Optional[str]) -> bool:
+    return _over_limit(nickname, remote_addr).exists()
+
+
+def register_pin_failure(nickname: Optional[str], remote_addr: Optional[str]) -> None:
+    cutoff = _window_start()
+    for scope, ident in _idents(nickname, remote_addr).items():
+        rows = PinLoginFailure.objects.filter(scope=scope, ident=ident)
+        if rows.filter(window_start__gt=cutoff).update(count=F("count") + 1):
+            continue
+        # No open window: restart an expired one, or create the row.
+        if rows.filter(window_start__lte=cutoff).update(count=1, window_start=now()):
+            continue
+        try:
+            with transaction.atomic():
+                PinLoginFailure.objects.create(scope=scope, ident=ident, count=1)
+        except IntegrityError:
+            # Created by a concurrent failure; count this one on top.
+            rows.update(count=F("count") + 1)
+
+
+def reset_pin_failures(nickname: str) -> None:
+    rows = PinLoginFailure.objects.filter(scope="nickname", ident=nickname)
+    # Checked first so the common case, a login without earlier failures, does not write.
+    if rows.exists():
+        rows.delete()
+
+
+async def ais_pin_login_throttled(nickname: Optional[str], remote_addr: Optional[str]) -> bool:
+    return await _over_limit(nickname, remote_addr).aexists()
+
+
+async def aregister_pin_failure(nickname: Optional[str], remote_addr: Optional[str]) -> None:
+    # Needs a transaction for the create race, which the async ORM does not offer.
+    await sync_to_async(register_pin_failure)(nickname, remote_addr)
+
+
+async def areset_pin_failures(nickname: str) -> None:
+    rows = PinLoginFailure.objects.filter(scope="nickname", ident=nickname)
+    if await rows.aexists():
+        await rows.adelete()
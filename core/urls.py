@@ -1,14 +1,26 @@
+from django.conf import settings
 from django.urls import path
 
-from . import views
+from . import async_views, views
+
+# The contestant hot path can run as async views (see core.async_views) when served over ASGI.
+contestant_views = async_views if getattr(settings, "CONTESTANT_VIEWS", "sync") == "async" else views
 
 urlpatterns = [
     path("", views.home, name="home"),
     path("register/", views.register, name="register"),
-    path("question/<uuid:question_id>/", views.question_entrypoint, name="question_entrypoint"),
-    path("question/<uuid:question_id>/view/", views.question_detail, name="question_detail"),
-    path("question/<uuid:question_id>/submit/", views.submit_answer, name="submit_answer"),
+    path("question/<uuid:question_id>/", contestant_views.question_entrypoint, name="question_entrypoint"),
+    path("question/<uuid:question_id>/view/", contestant_views.question_detail, name="question_detail"),
+    path("question/<uuid:question_id>/submit/", contestant_views.submit_answer, name="submit_answer"),
+    path("api/questions/<uuid:question_id>/", views.question_api, name="question_api"),
+    path("api/answers/", views.answers_api, name="answers_api"),
     path("admin/overview/", views.admin_dashboard, name="admin_dashboard"),
+    path("admin/overview/leaderboard.json", views.leaderboard_json, name="leaderboard_json"),
+    path("admin/overview/stream/", views.leaderboard_stream, name="leaderboard_stream"),
+    path("admin/analytics/", views.admin_analytics, name="admin_analytics"),
     path("admin/users/<slug:nickname>/", views.admin_user_detail, name="admin_user_detail"),
+    path("admin/export/answers/", views.export_answers, name="export_answers"),
+    path("admin/export/standings/", views.export_standings, name="export_standings"),
+    path("admin/metrics/", views.metrics, name="metrics"),
     path("logout/", views.logout_contestant, name="logout"),
 ]
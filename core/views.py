@@ -1,35 +1,63 @@
-from typing import Optional
+import asyncio
+import json
+from hashlib import md5
 from uuid import UUID
 
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django import forms
 from django.contrib.admin.views.decorators import staff_member_required
-from django.db.models import Count, Max, Q, F, ExpressionWrapper, DurationField
+from django.db.models import Count, Max, Sum
 from django.db.models.functions import Coalesce
-from django.http import HttpRequest, HttpResponse, HttpResponseRedirect
+from django.core import signing
+from django.core.handlers.asgi import ASGIRequest
+from django.middleware.csrf import get_token
+from django.http import (
+    HttpRequest,
+    HttpResponse,
+    HttpResponseBadRequest,
+    HttpResponseForbidden,
+    HttpResponseRedirect,
+    JsonResponse,
+    StreamingHttpResponse,
+)
 from django.shortcuts import get_object_or_404, redirect, render
 from django.urls import reverse
-
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.views.decorators.http import require_GET, require_POST
+from django.views.static import serve
+
+from . import services
+from .broadcast import broadcaster
+from .exports import (
+    ANSWER_HEADER,
+    FORMATS,
+    STANDINGS_HEADER,
+    aiter_chunks,
+    answer_rows,
+    parse_export_datetime,
+    standings_rows,
+)
+from .leaderboard import LeaderboardPage, leaderboard_page
+from .metrics import registry as metrics_registry
+from .stats import question_analytics
+from .caching import cache_page_for_anonymous
+from .bundles import correct_choice_texts, get_active_bundle_or_404, get_question_bundles
+from .images import VARIANTS_DIR
 from .forms import RegistrationForm, NicknameGateForm, AnswerForm
-from .models import QuizConfig, Contestant, Question, Answer
-
-SESSION_AUTH_USER_ID = "auth_user_id"
+from .middleware import SESSION_AUTH_USER_ID, clear_progress, get_progress, record_progress
+from .models import QuizConfig, Contestant, ContestantScore, Answer
 
 
 def logout_contestant(request: HttpRequest) -> HttpResponse:
+    # pop() only marks the session modified when the key was present, so
+    # logging out an anonymous visitor does not write a session.
     request.session.pop(SESSION_AUTH_USER_ID, None)
-    request.session.modified = True
+    clear_progress(request)
     return redirect("home")
 
 
-def _get_contestant_from_session(request: HttpRequest) -> Optional[Contestant]:
-    contestant_id = request.session.get(SESSION_AUTH_USER_ID)
-    if not contestant_id:
-        return None
-    try:
-        return Contestant.objects.get(id=contestant_id)
-    except Contestant.DoesNotExist:
-        return None
-
-
+@cache_page_for_anonymous()
 def home(request: HttpRequest) -> HttpResponse:
     cfg = QuizConfig.get_solo()
     return render(request, "home.html", {"cfg": cfg})
@@ -59,21 +87,28 @@ def register(request: HttpRequest) -> HttpResponse:
 
 def question_entrypoint(request: HttpRequest, question_id: UUID) -> HttpResponse:
     cfg = QuizConfig.get_solo()
-    question = get_object_or_404(Question, id=question_id, is_active=True)
+    question = get_active_bundle_or_404(question_id)
 
-    contestant = _get_contestant_from_session(request)
+    contestant = request.contestant
     if contestant:
         return redirect("question_detail", question_id=question.id)
 
     if request.method == "POST":
-        form = NicknameGateForm(request.POST)
+        form = NicknameGateForm(request.POST, remote_addr=request.META.get("REMOTE_ADDR"))
         if form.is_valid():
             contestant_obj: Contestant = form.cleaned_data["contestant_obj"]
             request.session[SESSION_AUTH_USER_ID] = str(contestant_obj.id)
-            request.session.modified = True
+            clear_progress(request)
+            # Seed progress now so it is saved with the login instead of
+            # costing a second session write on the first question view.
+            get_progress(request, contestant_obj)
             return redirect("question_detail", question_id=question.id)
     else:
-        form = NicknameGateForm()
+        return _conditional_response(
+            request,
+            _question_page_etag(request, question, "gate"),
+            lambda: render(request, "nickname_gate.html", {"cfg": cfg, "form": NicknameGateForm(), "question": question}),
+        )
 
     return render(
         request,
@@ -82,22 +117,55 @@ def question_entrypoint(request: HttpRequest, question_id: UUID) -> HttpResponse
     )
 
 
-def question_detail(request: HttpRequest, question_id: UUID) -> HttpResponse:
-    cfg = QuizConfig.get_solo()
-    question = get_object_or_404(Question, id=question_id, is_active=True)
-    contestant = _get_contestant_from_session(request)
-    if not contestant:
-        return redirect("question_entrypoint", question_id=question.id)
+def _question_page_etag(request: HttpRequest, question, *state) -> str:
+    """ETag for a question page: the question's version plus all per-visitor state it renders.
+
+    The CSRF secret is included because the page embeds a token derived from it;
+    get_token() creates it up front so a first visit already gets a stable ETag.
+    """
+    get_token(request)
+    parts = (question.version, request.META["CSRF_COOKIE"], *state)
+    return '"%s"' % md5("|".join(map(str, parts)).encode()).hexdigest()
 
-    # Submission cap
-    total_answers = Answer.objects.filter(contestant=contestant).count()
-    limit_reached = total_answers >= cfg.total_allowed_answers_per_user
 
-    # Already answered this question?
-    existing = Answer.objects.filter(contestant=contestant, question=question).first()
+def _conditional_response(request: HttpRequest, etag: str, render_response) -> HttpResponse:
+    """304 when If-None-Match matches ``etag``, otherwise the rendered response; both carry the ETag."""
+    response = get_conditional_response(request, etag=etag) or render_response()
+    response["ETag"] = etag
+    # Private because it depends on the visitor; no-cache so every reuse is revalidated.
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
 
-    form = AnswerForm(question)
 
+def _question_detail_response(
+    request: HttpRequest, cfg: QuizConfig, question, contestant: Contestant, progress
+) -> HttpResponse:
+    """Render (or 304) the question page for a logged-in contestant; shared with the async view."""
+    total_answers = progress.answer_count
+    limit_reached = total_answers >= cfg.total_allowed_answers_per_user
+    existing = progress.has_answered(question.id)
+    etag = _question_page_etag(
+        request, question, contestant.id, contestant.nickname, cfg.total_allowed_answers_per_user, total_answers, existing
+    )
+    return _conditional_response(
+        request,
+        etag,
+        lambda: _render_question_detail(
+            request, cfg, question, contestant, AnswerForm(question), total_answers, existing, limit_reached
+        ),
+    )
+
+
+def _render_question_detail(
+    request: HttpRequest,
+    cfg: QuizConfig,
+    question,
+    contestant: Contestant,
+    form: AnswerForm,
+    total_answers: int,
+    existing: bool = False,
+    limit_reached: bool = False,
+) -> HttpResponse:
     return render(
         request,
         "question_detail.html",
@@ -113,50 +181,53 @@ def question_detail(request: HttpRequest, question_id: UUID) -> HttpResponse:
     )
 
 
+def question_detail(request: HttpRequest, question_id: UUID) -> HttpResponse:
+    cfg = QuizConfig.get_solo()
+    question = get_active_bundle_or_404(question_id)
+    contestant = request.contestant
+    if not contestant:
+        return redirect("question_entrypoint", question_id=question.id)
+
+    progress = get_progress(request, contestant)
+    return _question_detail_response(request, cfg, question, contestant, progress)
+
+
 def submit_answer(request: HttpRequest, question_id: UUID) -> HttpResponse:
     cfg = QuizConfig.get_solo()
-    question = get_object_or_404(Question, id=question_id, is_active=True)
-    contestant = _get_contestant_from_session(request)
+    question = get_active_bundle_or_404(question_id)
+    contestant = request.contestant
     if not contestant:
         return redirect("question_entrypoint", question_id=question.id)
 
     if request.method != "POST":
         return redirect("question_detail", question_id=question.id)
 
+    progress = get_progress(request, contestant)
+
     # Enforce cap
-    total_answers = Answer.objects.filter(contestant=contestant).count()
+    total_answers = progress.answer_count
     if total_answers >= cfg.total_allowed_answers_per_user:
         return redirect("question_detail", question_id=question.id)
 
     # Prevent multiple submissions
-    if Answer.objects.filter(contestant=contestant, question=question).exists():
+    if progress.has_answered(question.id):
         return redirect("question_detail", question_id=question.id)
 
     form = AnswerForm(question, request.POST)
     if not form.is_valid():
         # Re-render detail with errors
-        return render(
-            request,
-            "question_detail.html",
-            {
-                "cfg": cfg,
-                "question": question,
-                "contestant": contestant,
-                "limit_reached": False,
-                "existing": None,
-                "form": form,
-                "remaining_after": max(0, cfg.total_allowed_answers_per_user - total_answers - 1),
-            },
-        )
+        return _render_question_detail(request, cfg, question, contestant, form, total_answers)
 
     choice = form.get_choice()
-    is_correct = bool(choice.is_correct)
-    Answer.objects.create(
-        contestant=contestant,
-        question=question,
-        selected_choice=choice,
-        is_correct=is_correct,
-    )
+    result = services.submit_answer(contestant, question, choice, cfg.total_allowed_answers_per_user)
+    if result.status == services.ALREADY_ANSWERED:
+        record_progress(request, contestant, question.id)
+        return redirect("question_detail", question_id=question.id)
+    if result.status == services.LIMIT_REACHED:
+        # The session's count was stale (e.g. answers from another device); resync on next view.
+        clear_progress(request)
+        return redirect("question_detail", question_id=question.id)
+    record_progress(request, contestant, question.id)
 
     remaining = max(0, cfg.total_allowed_answers_per_user - total_answers - 1)
 
@@ -172,63 +243,224 @@ def submit_answer(request: HttpRequest, question_id: UUID) -> HttpResponse:
     )
 
 
+# Maximum number of queued answers accepted by one answers_api POST.
+ANSWER_BATCH_MAX = 20
+INVALID = "invalid"
+
+
+def _api_login_required() -> JsonResponse:
+    return JsonResponse({"error": "Log in with your nickname and PIN first."}, status=401)
+
+
+@require_GET
+def question_api(request: HttpRequest, question_id: UUID) -> HttpResponse:
+    """Question bundle as JSON, revalidated with ETag / If-None-Match.
+
+    The ETag is the bundle's content version, so a client that already holds
+    the question gets an empty 304 instead of the body.
+    """
+    contestant = request.contestant
+    if not contestant:
+        return _api_login_required()
+    question = get_active_bundle_or_404(question_id)
+
+    return _conditional_response(
+        request,
+        f'"{question.version}"',
+        lambda: JsonResponse(
+            {
+                "id": question.id,
+                "version": question.version,
+                "title": question.title,
+                "body": question.body,
+                "choices": [{"id": choice.id, "text": choice.text} for choice in question.choices],
+                "images": [image._asdict() for image in question.images],
+            }
+        ),
+    )
+
+
+@require_POST
+def answers_api(request: HttpRequest) -> HttpResponse:
+    """Submit a batch of queued answers: ``{"answers": [{"question_id", "choice_id"}, ...]}``.
+
+    Each answer goes through the same checks and ``services.submit_answer`` call
+    as ``submit_answer``, in order, and gets its own status in ``results``.
+    """
+    cfg = QuizConfig.get_solo()
+    contestant = request.contestant
+    if not contestant:
+        return _api_login_required()
+    try:
+        items = json.loads(request.body)["answers"]
+        pairs = [(UUID(str(item["question_id"])), UUID(str(item["choice_id"]))) for item in items]
+    except (ValueError, KeyError, TypeError):
+        return JsonResponse({"error": "Expected {\"answers\": [{\"question_id\", \"choice_id\"}, ...]}."}, status=400)
+    if len(pairs) > ANSWER_BATCH_MAX:
+        return JsonResponse({"error": f"At most {ANSWER_BATCH_MAX} answers per request."}, status=400)
+
+    limit = cfg.total_allowed_answers_per_user
+    bundles = get_question_bundles({question_id for question_id, _ in pairs})
+    progress = get_progress(request, contestant)
+    results = []
+    for question_id, choice_id in pairs:
+        question = bundles.get(question_id)
+        if question is None or not question.is_active:
+            status = INVALID
+        elif progress.has_answered(question_id):
+            status = services.ALREADY_ANSWERED
+        elif progress.answer_count >= limit:
+            status = services.LIMIT_REACHED
+        else:
+            try:
+                choice = question.get_choice(choice_id)
+            except forms.ValidationError:
+                status = INVALID
+            else:
+                status = services.submit_answer(contestant, question, choice, limit).status
+                if status == services.LIMIT_REACHED:
+                    # Stale session count; resync from the database for the rest of the batch.
+                    clear_progress(request)
+                else:
+                    record_progress(request, contestant, question_id)
+                progress = get_progress(request, contestant)
+        results.append({"question_id": question_id, "status": status})
+
+    return JsonResponse(
+        {
+            "results": results,
+            "answer_count": progress.answer_count,
+            "remaining": max(0, limit - progress.answer_count),
+        }
+    )
+
+
 @staff_member_required
 def admin_dashboard(request: HttpRequest) -> HttpResponse:
     cfg = QuizConfig.get_solo()
 
-    totals = {
-        "registered_users": Contestant.objects.count(),
-        "total_answers": Answer.objects.count(),
-        "total_correct": Answer.objects.filter(is_correct=True).count(),
-        "last_answer_time": Answer.objects.aggregate(ts=Max("submitted_at")).get("ts"),
-    }
-
-    contestants = (
-        Contestant.objects.annotate(
-            correct_count=Count("answers", filter=Q(answers__is_correct=True)),
-            last_correct=Max("answers__submitted_at", filter=Q(answers__is_correct=True)),
-            last_answer=Max("answers__submitted_at"),
-        )
-        .annotate(ref_time=Coalesce(F("last_correct"), F("last_answer")))
-        .annotate(
-            elapsed=ExpressionWrapper(
-                F("ref_time") - cfg.quiz_started_at,
-                output_field=DurationField(),
-            )
-        )
-        .order_by("-correct_count", "elapsed", "nickname")
+    totals = ContestantScore.objects.aggregate(
+        registered_users=Count("id"),
+        total_answers=Coalesce(Sum("answer_count"), 0),
+        total_correct=Coalesce(Sum("correct_count"), 0),
+        last_answer_time=Max("last_answer"),
     )
 
+    try:
+        page = _leaderboard_page_from_request(request, cfg)
+    except signing.BadSignature:
+        return HttpResponseBadRequest("Invalid leaderboard cursor.")
+
     return render(
         request,
         "admin_dashboard.html",
-        {"cfg": cfg, "totals": totals, "contestants": contestants},
+        {
+            "cfg": cfg,
+            "totals": totals,
+            "contestants": page.rows,
+            "next_cursor": page.next_cursor,
+            "search": request.GET.get("q", "").strip(),
+            # The live feed needs an ASGI server; see leaderboard_stream.
+            "live_updates": isinstance(request, ASGIRequest),
+        },
+    )
+
+
+@staff_member_required
+def admin_analytics(request: HttpRequest) -> HttpResponse:
+    return render(
+        request,
+        "admin_analytics.html",
+        {
+            "questions": question_analytics(),
+            # Answers still waiting for the rollup task; served by a partial index.
+            "pending": Answer.objects.filter(stats_counted=False).count(),
+        },
+    )
+
+
+def _leaderboard_page_from_request(request: HttpRequest, cfg: QuizConfig) -> LeaderboardPage:
+    default_size = getattr(settings, "LEADERBOARD_PAGE_SIZE", 50)
+    try:
+        limit = min(max(int(request.GET.get("limit", default_size)), 1), 500)
+    except ValueError:
+        limit = default_size
+    return leaderboard_page(
+        cfg.quiz_started_at,
+        cursor=request.GET.get("after") or None,
+        search=request.GET.get("q", "").strip(),
+        limit=limit,
     )
 
 
+@staff_member_required
+def leaderboard_json(request: HttpRequest) -> HttpResponse:
+    cfg = QuizConfig.get_solo()
+    try:
+        page = _leaderboard_page_from_request(request, cfg)
+    except signing.BadSignature:
+        return JsonResponse({"error": "Invalid leaderboard cursor."}, status=400)
+    return JsonResponse(
+        {
+            "results": [
+                {
+                    "rank": row.rank,
+                    "nickname": row.nickname,
+                    "correct_count": row.correct_count,
+                    "answer_count": row.answer_count,
+                    "elapsed_seconds": row.elapsed.total_seconds() if row.elapsed is not None else None,
+                }
+                for row in page.rows
+            ],
+            "next": page.next_cursor,
+        }
+    )
+
+
+async def leaderboard_stream(request: HttpRequest) -> HttpResponse:
+    """Server-Sent Events feed of leaderboard deltas; requires an ASGI server.
+
+    Under WSGI the never-ending stream would be buffered in full and tie up a
+    worker for good, so it answers 204, which tells EventSource not to reconnect.
+    """
+    is_staff = await sync_to_async(lambda: request.user.is_active and request.user.is_staff)()
+    if not is_staff:
+        return HttpResponseForbidden()
+    if not isinstance(request, ASGIRequest):
+        return HttpResponse(status=204)
+
+    keepalive = getattr(settings, "LEADERBOARD_STREAM_KEEPALIVE_SECONDS", 15)
+
+    async def events():
+        queue = await broadcaster.subscribe()
+        try:
+            while True:
+                try:
+                    yield await asyncio.wait_for(queue.get(), timeout=keepalive)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+        finally:
+            broadcaster.unsubscribe(queue)
+
+    response = StreamingHttpResponse(events(), content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"
+    return response
+
+
 @staff_member_required
 def admin_user_detail(request: HttpRequest, nickname: str) -> HttpResponse:
     cfg = QuizConfig.get_solo()
     contestant = get_object_or_404(Contestant, nickname=nickname)
-    answers = (
+    answers = list(
         Answer.objects.filter(contestant=contestant)
         .select_related("question", "selected_choice")
         .order_by("submitted_at")
     )
 
-    mapping = {}
-    question_ids = set()
+    mapping = correct_choice_texts(a.question_id for a in answers)
     for a in answers:
-        question_ids.add(a.question_id)
-    for qid in question_ids:
-        try:
-            q = Question.objects.get(id=qid)
-            cc = q.correct_choice()
-            mapping[qid] = cc.text if cc else ""
-        except Question.DoesNotExist:
-            mapping[qid] = ""
-    for a in answers:
-        setattr(a, "correct_text", mapping.get(a.question_id, ""))
+        a.correct_text = mapping.get(a.question_id, "")
 
     return render(
         request,
@@ -239,3 +471,51 @@ def admin_user_detail(request: HttpRequest, nickname: str) -> HttpResponse:
             "answers": answers,
         },
     )
+
+
+@staff_member_required
+def metrics(request: HttpRequest) -> HttpResponse:
+    return HttpResponse(metrics_registry.render_prometheus(), content_type="text/plain; version=0.0.4; charset=utf-8")
+
+
+def _export_response(request: HttpRequest, header, rows, basename: str) -> HttpResponse:
+    fmt = request.GET.get("format", "csv")
+    if fmt not in FORMATS:
+        return HttpResponseBadRequest("Unknown export format.")
+    render_lines, content_type = FORMATS[fmt]
+    lines = render_lines(header, rows)
+    if isinstance(request, ASGIRequest):
+        # An ASGI server needs an async iterator to stream rather than buffer.
+        lines = aiter_chunks(lines)
+    response = StreamingHttpResponse(lines, content_type=content_type)
+    response["Content-Disposition"] = f'attachment; filename="{basename}.{fmt}"'
+    return response
+
+
+@staff_member_required
+def export_answers(request: HttpRequest) -> HttpResponse:
+    try:
+        since = parse_export_datetime(request.GET.get("since"))
+        until = parse_export_datetime(request.GET.get("until"))
+        question_ids = [UUID(value) for value in request.GET.getlist("question")]
+    except ValueError as exc:
+        return HttpResponseBadRequest(str(exc))
+    return _export_response(request, ANSWER_HEADER, answer_rows(since, until, question_ids), "answers")
+
+
+@staff_member_required
+def export_standings(request: HttpRequest) -> HttpResponse:
+    cfg = QuizConfig.get_solo()
+    return _export_response(request, STANDINGS_HEADER, standings_rows(cfg.quiz_started_at), "standings")
+
+
+def serve_media(request: HttpRequest, path: str, document_root=None, show_indexes: bool = False) -> HttpResponse:
+    """Development media server: content-hashed image variants are immutable, other files revalidate."""
+    response = serve(request, path, document_root=document_root, show_indexes=show_indexes)
+    if response.status_code == 200:
+        if path.startswith(VARIANTS_DIR):
+            response["Cache-Control"] = "public, max-age=31536000, immutable"
+        else:
+            # Unhashed originals may be replaced under the same name: revalidate via Last-Modified.
+            patch_cache_control(response, public=True, no_cache=True)
+    return response
@@ -3,6 +3,10 @@ ASGI config for quiz_hunt project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+Serve the project through this entry point (e.g. ``uvicorn quiz_hunt.asgi:application``)
+to enable the live leaderboard stream at ``/admin/overview/stream/``; under WSGI
+a long-lived Server-Sent Events response would pin a worker thread per viewer.
+
 For more information on this file, see
 https://docs.djangoproject.com/en/4.2/howto/deployment/asgi/
 """